@@ -1,6 +1,37 @@
 from ..state_schema import State, Competition
-from ..viz.maps import render_competition_heatmap
-from ..utils.competitor_data import load_competitor_entities
+from ..viz.render_service import render
+from ..viz.maps import competition_entity_names
+from ..utils.competitor_data import load_competitor_entities, COMPETITION_DIR
+from ..utils.gazetteer import source_path
+from ..utils.geocode import geocode_key, locate
+
+
+# State fields this node reads / writes (used by the DAG scheduler)
+READS = ()
+WRITES = ("competition",)
+# Env flags and data files outside State that change this node's output (incremental cache)
+ENV = (
+    "USE_GOOGLE_STATIC_MAPS", "GOOGLE_MAPS_API_KEY", "GEOCODE_GAZETTEER",
+    "HEATMAP_GRID", "HEATMAP_BANDWIDTH", "HEATMAP_METHOD", "HEATMAP_CATEGORY_WEIGHTS",
+    "MAP_FORMAT", "WEBP_QUALITY",
+)
+
+
+def input_files(ctx):
+    return sorted(str(p) for p in COMPETITION_DIR.glob("*.csv")) + [
+        str(COMPETITION_DIR / f"{ctx['country']}_entities.txt"),
+        str(source_path(ctx["country"])),
+    ]
+
+
+def geocode_inputs(ctx):
+    # Marker coordinates the maps will use; a changed lookup invalidates the cached node
+    company, country = ctx["company"]["name"], ctx["country"]
+    comps = load_competitor_entities(company, country) or None
+    return {
+        geocode_key(name, country): locate(name, country, ctx.get("geocodes"))
+        for name in competition_entity_names(company, country, comps)
+    }
 
 
 def run(state: State, ctx):
@@ -8,8 +39,8 @@ def run(state: State, ctx):
     country = ctx["country"]
     comps = load_competitor_entities(company, country) or []
     # Pass full entities so renderer can colorize by category
-    heatmap_png, markers_map_png, positioning, whitespaces = render_competition_heatmap(
-        company, country, comps if comps else None
+    heatmap_png, markers_map_png, positioning, whitespaces = render(
+        "competition_heatmap", company, country, comps if comps else None, ctx.get("geocodes")
     )
     if comps:
         positioning = {**positioning, "entities": comps}
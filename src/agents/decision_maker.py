@@ -1,6 +1,11 @@
 from ..state_schema import State, Decision
 
 
+# State fields this node reads / writes (used by the DAG scheduler)
+READS = ("reg_compliance", "competition", "partners")
+WRITES = ("decision",)
+
+
 def run(state: State, ctx):
     cov = state.reg_compliance.coverage if state.reg_compliance else 0.0
     tbd_ratio = (
@@ -1,4 +1,8 @@
+import gc
 import os
+import json
+import shutil
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from docx import Document
 from docx.shared import Inches, Pt
@@ -6,15 +10,31 @@ from docx.enum.table import WD_TABLE_ALIGNMENT
 from docx.oxml import OxmlElement
 from docx.oxml.ns import qn
 from loguru import logger
-from .narrative import generate_texts
+from .narrative import submit_texts
+from .report_writer import snapshot_case
+from ..utils.docx_merge import merge_sections
+from ..viz.formats import docx_image, existing_variant
 
 
-def run(state, meta, out_dir: str):
-    """Aggregate all company x country outputs into a single Word report (.docx)."""
-    os.makedirs(out_dir, exist_ok=True)
-    keep_all = str(os.getenv('KEEP_ALL_FINALS','0')).lower() in ('1','true','yes')
-    ts = datetime.now().strftime("%Y%m%d_%H%M")
-    path = os.path.join(out_dir, f"Final_Report_{ts}.docx") if keep_all else os.path.join(out_dir, "Final_Report.docx")
+# Per-case section packages for FINAL_REPORT_STREAMING (removed after the merge)
+SECTIONS_DIR = ".report_sections"
+
+
+def _load_case(state, section: str, name: str, country: str):
+    cases = getattr(state, "cases", None)
+    if cases and (name, country) in cases:
+        return snapshot_case(cases[(name, country)], name, country)
+    case_json = os.path.join(section, "case_state.json")
+    if os.path.exists(case_json):
+        try:
+            with open(case_json, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return None
+    return None
+
+
+def _new_document():
     doc = Document()
     # compact spacing to reduce blank areas
     try:
@@ -24,231 +44,346 @@ def run(state, meta, out_dir: str):
         base.paragraph_format.space_before = Pt(0)
     except Exception:
         pass
-    doc.add_heading('Market Entry Strategy Report', level=1)
-
-    for company in meta.get("companies", []):
-        name = company.get("name")
-        for country in company.get("target_countries", []):
-            section = os.path.join(out_dir, f"{name}_{country}")
-            doc.add_heading(f"{name} x {country}", level=2)
-            doc.add_paragraph("1) Executive / Decision")
-
-            # Load case state
-            case = None
-            case_json = os.path.join(section, "case_state.json")
-            if os.path.exists(case_json):
-                try:
-                    import json
-                    with open(case_json, "r", encoding="utf-8") as f:
-                        case = json.load(f)
-                except Exception:
-                    case = None
-
-            cov = (case or {}).get('coverage') if case else None
-            tbd = (case or {}).get('tbd_ratio') if case else None
-            badge = (case or {}).get('risk_badge') if case else ''
-            dec = (case or {}).get('decision', {}) if case else {}
-            sc0 = (dec.get('scorecard', {}) or {})
-            final0 = sc0.get('final')
-
-            # KPI badges table
-            kpi = doc.add_table(rows=1, cols=4)
-            kpi.alignment = WD_TABLE_ALIGNMENT.CENTER
-            hdr = kpi.rows[0].cells
-            hdr[0].text = f"Decision: {dec.get('status','')}"
-            hdr[1].text = f"Coverage: {round((cov or 0)*100)}%"
-            hdr[2].text = f"TBD: {round((tbd or 0)*100)}%"
-            hdr[3].text = f"Risk: {badge or ''}"
-
-            for i, cell in enumerate(hdr):
-                if i == 0:
-                    col_hex = 'E2E8F0'
-                elif i == 3 and badge == 'High':
-                    col_hex = 'FEE2E2'
-                elif i == 3 and badge == 'Medium':
-                    col_hex = 'FEF3C7'
-                elif i == 3 and badge == 'Low':
-                    col_hex = 'DCFCE7'
-                else:
-                    col_hex = 'F1F5F9'
-                tcPr = cell._tc.get_or_add_tcPr()
-                shd = OxmlElement('w:shd')
-                shd.set(qn('w:val'), 'clear')
-                shd.set(qn('w:color'), 'auto')
-                shd.set(qn('w:fill'), col_hex)
-                tcPr.append(shd)
-                for p in cell.paragraphs:
-                    for run in p.runs:
-                        run.font.size = Pt(10)
-
-            # LLM executive narrative (optional)
-            use_llm = str(os.getenv('USE_LLM_NARRATIVE','0')).lower() in ('1','true','yes')
-            llm_texts = generate_texts(case) if (use_llm and case) else {}
-            if llm_texts.get('exec'):
-                doc.add_paragraph(llm_texts['exec'])
-
-            # Helpers for images (standardized filenames)
-            def _img(path: str, width_in: float = 6.0):
-                try:
-                    if os.path.exists(path):
-                        doc.add_picture(path, width=Inches(width_in))
-                        return True
-                except Exception:
-                    pass
-                return False
-
-            std_market = os.path.join(section, f"01_market_summary_{name}_{country}.png")
-            std_customs = os.path.join(section, f"02_customs_flow_{name}_{country}.png")
-            std_heatmap = os.path.join(section, f"03_competition_heatmap_{name}_{country}.png")
-            std_partner = os.path.join(section, f"04_partner_map_{name}_{country}.png")
-            std_map = os.path.join(section, f"map_{name}_{country}.png")
-
-            # 2) Market
-            doc.add_paragraph("2) Market")
-            if llm_texts.get('market'):
-                doc.add_paragraph(llm_texts['market'])
-            if case:
-                m = case.get("market", {})
-                why = m.get('why_now','')
-                metrics = m.get('metrics', {}) or {}
-                tam = metrics.get('TAM'); cagr = metrics.get('CAGR'); pen = metrics.get('Ecom Penetration')
-                infra = metrics.get('Infra Score'); ship = metrics.get('Avg Ship Cost')
-                market_txt = (
-                    f"TAM {tam}, CAGR {cagr}, penetration {pen}, infra {infra}, avg ship cost {ship}. "
-                    f"Why Now: {why}"
-                )
-                doc.add_paragraph(market_txt)
-            # Market image directly under narrative
-            _img(std_market, width_in=6.0)
-
-            # 3) Regulation
-            doc.add_paragraph("3) Regulation")
-            if llm_texts.get('regulation'):
-                doc.add_paragraph(llm_texts['regulation'])
-            if case:
-                cov_pct = round((cov or 0)*100)
-                tbd_pct = round((tbd or 0)*100)
-                blocker_txt = 'Yes' if (sc0.get('blocker') or False) else 'No'
-                reg_line = f"Coverage {cov_pct}%, TBD {tbd_pct}%, MUST violation {blocker_txt}."
-                doc.add_paragraph(reg_line)
-            # Customs flow image
-            _img(std_customs, width_in=6.0)
-
-            # 4) Competition
-            comp = case.get("competition", {}) if case else {}
-            ws = comp.get("whitespaces", []) if comp else []
-            if ws:
-                doc.add_paragraph("4) Competition")
-                if llm_texts.get('competition'):
-                    doc.add_paragraph(llm_texts['competition'])
-                doc.add_paragraph(f"Whitespaces {len(ws)}:")
-                for w in ws:
-                    doc.add_paragraph(str(w), style="List Bullet")
-            ents = comp.get('entities', []) if comp else []
-            if ents:
-                t = doc.add_table(rows=1, cols=3)
-                t.rows[0].cells[0].text = 'Competitor'
-                t.rows[0].cells[1].text = 'Category'
-                t.rows[0].cells[2].text = 'Homepage'
-                for e in ents[:12]:
-                    row = t.add_row().cells
-                    row[0].text = e.get('name','')
-                    row[1].text = e.get('category','')
-                    row[2].text = e.get('homepage','')
-            # Competition images (heatmap + base map) side-by-side to reduce vertical whitespace
-            if os.path.exists(std_heatmap) or os.path.exists(std_map):
-                tbl = doc.add_table(rows=1, cols=2)
-                cells = tbl.rows[0].cells
-                try:
-                    if os.path.exists(std_heatmap):
-                        run = cells[0].paragraphs[0].add_run()
-                        run.add_picture(std_heatmap, width=Inches(3.15))
-                    if os.path.exists(std_map):
-                        run = cells[1].paragraphs[0].add_run()
-                        run.add_picture(std_map, width=Inches(3.15))
-                except Exception:
-                    # Fallback to stacked if table approach fails
-                    _img(std_heatmap, width_in=6.0)
-                    _img(std_map, width_in=6.0)
-
-            # 5) GTM
-            gtm = case.get("gtm", {}) if case else {}
-            table_rows = gtm.get("table", []) if gtm else []
-            if table_rows:
-                doc.add_paragraph("5) GTM (High/Mid/Low → selected)")
-                if llm_texts.get('gtm'):
-                    doc.add_paragraph(llm_texts['gtm'])
-                t = doc.add_table(rows=1, cols=4)
-                hdr = t.rows[0].cells
-                hdr[0].text = "Segment"; hdr[1].text = "Score"; hdr[2].text = "ICP"; hdr[3].text = "Offer"
-                for r in table_rows:
-                    row = t.add_row().cells
-                    row[0].text = str(r.get("segment",""))
-                    row[1].text = str(r.get("score",""))
-                    row[2].text = str(r.get("icp",""))
-                    row[3].text = str(r.get("offer",""))
-
-            # 6) Partners
-            partners = case.get("partners", []) if case else []
-            if partners:
-                doc.add_paragraph("6) Partners")
-                if llm_texts.get('partners'):
-                    doc.add_paragraph(llm_texts['partners'])
-                doc.add_paragraph(f"{len(partners)} partner candidates.")
-                for p in partners:
-                    doc.add_paragraph(f"{p.get('name','')} ({p.get('role','')}) · priority={p.get('priority','')}", style="List Bullet")
-            # Partner map image
-            _img(std_partner, width_in=6.0)
-
-            # 7) Risks
-            risks = case.get("risks", []) if case else []
-            if risks:
-                doc.add_paragraph("7) Risks")
-                if llm_texts.get('risks'):
-                    doc.add_paragraph(llm_texts['risks'])
-                for r in risks:
-                    doc.add_paragraph(f"{r.get('risk','')} · prob={r.get('prob','')} · impact={r.get('impact','')} · mitigation={r.get('mitigation','')} (trigger: {r.get('trigger','')})", style="List Bullet")
-
-            # 8) Decision Scorecard
-            if sc0:
-                doc.add_paragraph("8) Decision Scorecard")
-                t2 = doc.add_table(rows=0, cols=2)
-                for k in ["base","cov","tbd_ratio","competition_high","partners","final"]:
-                    row = t2.add_row().cells
-                    row[0].text = k
-                    row[1].text = str(sc0.get(k, ""))
-
-            # 9) Overall
-            status = dec.get('status','')
-            overall = f"9) Overall: recommend='{status}'."
-            if llm_texts.get('overall'):
-                doc.add_paragraph(llm_texts['overall'])
-            else:
-                doc.add_paragraph(overall)
-
-            # 10) 30/60/90 + Evidence (keep concise; images already placed near narratives)
-            if any(llm_texts.get(k) for k in ('plan_30','plan_60','plan_90')):
-                doc.add_paragraph("10) 30/60/90 plan")
-                if llm_texts.get('plan_30'):
-                    doc.add_paragraph(llm_texts['plan_30'])
-                if llm_texts.get('plan_60'):
-                    doc.add_paragraph(llm_texts['plan_60'])
-                if llm_texts.get('plan_90'):
-                    doc.add_paragraph(llm_texts['plan_90'])
-
-            # Keep pagination minimal: optional page break via env
-            if str(os.getenv('PAGE_BREAK_BETWEEN_CASES','0')).lower() in ('1','true','yes'):
-                doc.add_page_break()
-
-    # Save file
+    return doc
+
+
+def _add_case_section(doc, case, llm_texts, section: str, name: str, country: str):
+    """Append one company x country section (headings, tables, images, narrative) to ``doc``."""
+    doc.add_heading(f"{name} x {country}", level=2)
+    doc.add_paragraph("1) Executive / Decision")
+
+    cov = (case or {}).get('coverage') if case else None
+    tbd = (case or {}).get('tbd_ratio') if case else None
+    badge = (case or {}).get('risk_badge') if case else ''
+    dec = (case or {}).get('decision', {}) if case else {}
+    sc0 = (dec.get('scorecard', {}) or {})
+    final0 = sc0.get('final')
+
+    # KPI badges table
+    kpi = doc.add_table(rows=1, cols=4)
+    kpi.alignment = WD_TABLE_ALIGNMENT.CENTER
+    hdr = kpi.rows[0].cells
+    hdr[0].text = f"Decision: {dec.get('status','')}"
+    hdr[1].text = f"Coverage: {round((cov or 0)*100)}%"
+    hdr[2].text = f"TBD: {round((tbd or 0)*100)}%"
+    hdr[3].text = f"Risk: {badge or ''}"
+
+    for i, cell in enumerate(hdr):
+        if i == 0:
+            col_hex = 'E2E8F0'
+        elif i == 3 and badge == 'High':
+            col_hex = 'FEE2E2'
+        elif i == 3 and badge == 'Medium':
+            col_hex = 'FEF3C7'
+        elif i == 3 and badge == 'Low':
+            col_hex = 'DCFCE7'
+        else:
+            col_hex = 'F1F5F9'
+        tcPr = cell._tc.get_or_add_tcPr()
+        shd = OxmlElement('w:shd')
+        shd.set(qn('w:val'), 'clear')
+        shd.set(qn('w:color'), 'auto')
+        shd.set(qn('w:fill'), col_hex)
+        tcPr.append(shd)
+        for p in cell.paragraphs:
+            for run in p.runs:
+                run.font.size = Pt(10)
+
+    # LLM executive narrative (optional)
+    llm_texts = llm_texts or {}
+    if llm_texts.get('exec'):
+        doc.add_paragraph(llm_texts['exec'])
+
+    # Helpers for images (standardized filenames; SVG/PDF/WebP get a raster for Word)
+    def _pic(path, width_in: float, kind: str = "map"):
+        # Unreadable image or a cache entry removed by another worker: skip the image, not the report
+        try:
+            return docx_image(path, width_in, kind)
+        except Exception as e:
+            logger.warning("Could not prepare image {} for the report: {}", path, e)
+            return None
+
+    def _img(path, width_in: float = 6.0, kind: str = "map"):
+        try:
+            pic = _pic(path, width_in, kind)
+            if pic is not None:
+                doc.add_picture(pic, width=Inches(width_in))
+                return True
+        except Exception:
+            pass
+        return False
+
+    def _std(stem: str):
+        return existing_variant(os.path.join(section, f"{stem}_{name}_{country}.png"))
+
+    std_market = _std("01_market_summary")
+    std_customs = _std("02_customs_flow")
+    std_heatmap = _std("03_competition_heatmap")
+    std_partner = _std("04_partner_map")
+    std_map = _std("map")
+
+    # 2) Market
+    doc.add_paragraph("2) Market")
+    if llm_texts.get('market'):
+        doc.add_paragraph(llm_texts['market'])
+    if case:
+        m = case.get("market", {})
+        why = m.get('why_now','')
+        metrics = m.get('metrics', {}) or {}
+        tam = metrics.get('TAM'); cagr = metrics.get('CAGR'); pen = metrics.get('Ecom Penetration')
+        infra = metrics.get('Infra Score'); ship = metrics.get('Avg Ship Cost')
+        market_txt = (
+            f"TAM {tam}, CAGR {cagr}, penetration {pen}, infra {infra}, avg ship cost {ship}. "
+            f"Why Now: {why}"
+        )
+        doc.add_paragraph(market_txt)
+    # Market image directly under narrative
+    _img(std_market, width_in=6.0, kind="diagram")
+
+    # 3) Regulation
+    doc.add_paragraph("3) Regulation")
+    if llm_texts.get('regulation'):
+        doc.add_paragraph(llm_texts['regulation'])
+    if case:
+        cov_pct = round((cov or 0)*100)
+        tbd_pct = round((tbd or 0)*100)
+        blocker_txt = 'Yes' if (sc0.get('blocker') or False) else 'No'
+        reg_line = f"Coverage {cov_pct}%, TBD {tbd_pct}%, MUST violation {blocker_txt}."
+        doc.add_paragraph(reg_line)
+    # Customs flow image
+    _img(std_customs, width_in=6.0, kind="diagram")
+
+    # 4) Competition
+    comp = case.get("competition", {}) if case else {}
+    ws = comp.get("whitespaces", []) if comp else []
+    if ws:
+        doc.add_paragraph("4) Competition")
+        if llm_texts.get('competition'):
+            doc.add_paragraph(llm_texts['competition'])
+        doc.add_paragraph(f"Whitespaces {len(ws)}:")
+        for w in ws:
+            doc.add_paragraph(str(w), style="List Bullet")
+    ents = comp.get('entities', []) if comp else []
+    if ents:
+        t = doc.add_table(rows=1, cols=3)
+        t.rows[0].cells[0].text = 'Competitor'
+        t.rows[0].cells[1].text = 'Category'
+        t.rows[0].cells[2].text = 'Homepage'
+        for e in ents[:12]:
+            row = t.add_row().cells
+            row[0].text = e.get('name','')
+            row[1].text = e.get('category','')
+            row[2].text = e.get('homepage','')
+    # Competition images (heatmap + base map) side-by-side to reduce vertical whitespace
+    heat_pic, map_pic = _pic(std_heatmap, 3.15), _pic(std_map, 3.15)
+    if heat_pic is not None or map_pic is not None:
+        tbl = doc.add_table(rows=1, cols=2)
+        cells = tbl.rows[0].cells
+        try:
+            if heat_pic is not None:
+                run = cells[0].paragraphs[0].add_run()
+                run.add_picture(heat_pic, width=Inches(3.15))
+            if map_pic is not None:
+                run = cells[1].paragraphs[0].add_run()
+                run.add_picture(map_pic, width=Inches(3.15))
+        except Exception:
+            # Fallback to stacked if table approach fails
+            _img(std_heatmap, width_in=6.0)
+            _img(std_map, width_in=6.0)
+
+    # 5) GTM
+    gtm = case.get("gtm", {}) if case else {}
+    table_rows = gtm.get("table", []) if gtm else []
+    if table_rows:
+        doc.add_paragraph("5) GTM (High/Mid/Low → selected)")
+        if llm_texts.get('gtm'):
+            doc.add_paragraph(llm_texts['gtm'])
+        t = doc.add_table(rows=1, cols=4)
+        hdr = t.rows[0].cells
+        hdr[0].text = "Segment"; hdr[1].text = "Score"; hdr[2].text = "ICP"; hdr[3].text = "Offer"
+        for r in table_rows:
+            row = t.add_row().cells
+            row[0].text = str(r.get("segment",""))
+            row[1].text = str(r.get("score",""))
+            row[2].text = str(r.get("icp",""))
+            row[3].text = str(r.get("offer",""))
+
+    # 6) Partners
+    partners = case.get("partners", []) if case else []
+    if partners:
+        doc.add_paragraph("6) Partners")
+        if llm_texts.get('partners'):
+            doc.add_paragraph(llm_texts['partners'])
+        doc.add_paragraph(f"{len(partners)} partner candidates.")
+        for p in partners:
+            doc.add_paragraph(f"{p.get('name','')} ({p.get('role','')}) · priority={p.get('priority','')}", style="List Bullet")
+    # Partner map image
+    _img(std_partner, width_in=6.0)
+
+    # 7) Risks
+    risks = case.get("risks", []) if case else []
+    if risks:
+        doc.add_paragraph("7) Risks")
+        if llm_texts.get('risks'):
+            doc.add_paragraph(llm_texts['risks'])
+        for r in risks:
+            doc.add_paragraph(f"{r.get('risk','')} · prob={r.get('prob','')} · impact={r.get('impact','')} · mitigation={r.get('mitigation','')} (trigger: {r.get('trigger','')})", style="List Bullet")
+
+    # 8) Decision Scorecard
+    if sc0:
+        doc.add_paragraph("8) Decision Scorecard")
+        t2 = doc.add_table(rows=0, cols=2)
+        for k in ["base","cov","tbd_ratio","competition_high","partners","final"]:
+            row = t2.add_row().cells
+            row[0].text = k
+            row[1].text = str(sc0.get(k, ""))
+
+    # 9) Overall
+    status = dec.get('status','')
+    overall = f"9) Overall: recommend='{status}'."
+    if llm_texts.get('overall'):
+        doc.add_paragraph(llm_texts['overall'])
+    else:
+        doc.add_paragraph(overall)
+
+    # 10) 30/60/90 + Evidence (keep concise; images already placed near narratives)
+    if any(llm_texts.get(k) for k in ('plan_30','plan_60','plan_90')):
+        doc.add_paragraph("10) 30/60/90 plan")
+        if llm_texts.get('plan_30'):
+            doc.add_paragraph(llm_texts['plan_30'])
+        if llm_texts.get('plan_60'):
+            doc.add_paragraph(llm_texts['plan_60'])
+        if llm_texts.get('plan_90'):
+            doc.add_paragraph(llm_texts['plan_90'])
+
+    # Keep pagination minimal: optional page break via env
+    if str(os.getenv('PAGE_BREAK_BETWEEN_CASES','0')).lower() in ('1','true','yes'):
+        doc.add_page_break()
+
+
+def _write_section(case, llm_texts, section: str, name: str, country: str, out_path: str) -> str:
+    # One case in its own package; the Document (and its images) is released on return
+    doc = _new_document()
+    _add_case_section(doc, case, llm_texts, section, name, country)
+    doc.save(out_path)
+    del doc
+    # python-docx parts and package reference each other, so a finished section's
+    # XML trees (native memory the collector does not see) wait for a cyclic GC
+    gc.collect()
+    return out_path
+
+
+def _build_section(case, use_llm: bool, section: str, name: str, country: str, out_path: str) -> str:
+    # Worker process: loads its own case_state.json (unless the parent passed the case)
+    # and requests its own narratives, so sections never wait on each other's LLM text
+    if case is None:
+        case = _load_case(None, section, name, country)
+    llm_texts = submit_texts(case).result() if (use_llm and case) else {}
+    return _write_section(case, llm_texts, section, name, country, out_path)
+
+
+def _in_memory_case(state, section: str, name: str, country: str):
+    # Only cases with no case_state.json on disk are shipped to the workers
+    cases = getattr(state, "cases", None)
+    if cases and (name, country) in cases and not os.path.exists(os.path.join(section, "case_state.json")):
+        return snapshot_case(cases[(name, country)], name, country)
+    return None
+
+
+def _load_cases(state, targets, use_llm: bool):
+    cases = []
+    for section, name, country in targets:
+        # Load case state (in-memory aggregate first, case_state.json otherwise)
+        case = _load_case(state, section, name, country)
+        # Queue every case's narrative prompts up front; they run concurrently
+        # (LLM_CONCURRENCY) while earlier sections are being built
+        pending = submit_texts(case) if (use_llm and case) else None
+        cases.append((case, pending, section, name, country))
+    return cases
+
+
+def _report_workers() -> int:
+    return int(os.getenv('FINAL_REPORT_WORKERS', '0') or 0)
+
+
+def _save_report(save, path: str, out_dir: str) -> str:
     try:
-        doc.save(path)
+        save(path)
     except PermissionError:
         ts_fallback = datetime.now().strftime("%Y%m%d_%H%M%S")
         alt = os.path.join(out_dir, f"Final_Report_{ts_fallback}.docx")
         logger.warning("Final_Report locked ({}). Saving as {}", path, alt)
-        doc.save(alt)
+        save(alt)
         path = alt
+    return path
+
+
+def _llm_result(pending):
+    return pending.result() if pending is not None else {}
+
+
+def _run_streaming(state, targets, use_llm: bool, out_dir: str, path: str) -> str:
+    """Build every case section as its own .docx, then merge them into ``path`` in case order.
+
+    Peak memory is one case section (per worker) rather than the whole portfolio.
+    With FINAL_REPORT_WORKERS > 1 sections are built on a process pool, each worker
+    loading its case and requesting its narratives, and merged as soon as each
+    one's predecessors are done.
+    """
+    sections_dir = os.path.join(out_dir, SECTIONS_DIR)
+    shutil.rmtree(sections_dir, ignore_errors=True)
+    os.makedirs(sections_dir)
+    try:
+        base = os.path.join(sections_dir, "base.docx")
+        doc = _new_document()
+        doc.add_heading('Market Entry Strategy Report', level=1)
+        doc.save(base)
+        del doc
+        parts = [os.path.join(sections_dir, f"{i:04d}.docx") for i in range(len(targets))]
+        workers = min(_report_workers(), len(targets))
+        if workers > 1:
+            logger.info("Building {} report sections on {} worker processes", len(targets), workers)
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                futures = [
+                    ex.submit(_build_section, _in_memory_case(state, section, name, country), use_llm, section, name, country, part)
+                    for (section, name, country), part in zip(targets, parts)
+                ]
+                return _save_report(lambda p: merge_sections(base, (f.result() for f in futures), p), path, out_dir)
+        for (case, pending, section, name, country), part in zip(_load_cases(state, targets, use_llm), parts):
+            _write_section(case, _llm_result(pending), section, name, country, part)
+        return _save_report(lambda p: merge_sections(base, parts, p), path, out_dir)
+    finally:
+        shutil.rmtree(sections_dir, ignore_errors=True)
+
+
+def run(state, meta, out_dir: str):
+    """Aggregate all company x country outputs into a single Word report (.docx).
+
+    FINAL_REPORT_STREAMING=1 builds and saves one section per case and merges the
+    packages at the end, instead of holding every case in one in-memory Document.
+    FINAL_REPORT_WORKERS > 1 does the same with sections built in parallel.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    keep_all = str(os.getenv('KEEP_ALL_FINALS','0')).lower() in ('1','true','yes')
+    streaming = str(os.getenv('FINAL_REPORT_STREAMING','0')).lower() in ('1','true','yes')
+    ts = datetime.now().strftime("%Y%m%d_%H%M")
+    path = os.path.join(out_dir, f"Final_Report_{ts}.docx") if keep_all else os.path.join(out_dir, "Final_Report.docx")
+    use_llm = str(os.getenv('USE_LLM_NARRATIVE','0')).lower() in ('1','true','yes')
+
+    targets = [
+        (os.path.join(out_dir, f"{company.get('name')}_{country}"), company.get("name"), country)
+        for company in meta.get("companies", [])
+        for country in company.get("target_countries", [])
+    ]
+
+    if streaming or _report_workers() > 1:
+        path = _run_streaming(state, targets, use_llm, out_dir, path)
+    else:
+        doc = _new_document()
+        doc.add_heading('Market Entry Strategy Report', level=1)
+        for case, pending, section, name, country in _load_cases(state, targets, use_llm):
+            _add_case_section(doc, case, _llm_result(pending), section, name, country)
+        path = _save_report(doc.save, path, out_dir)
 
     if not keep_all:
         try:
@@ -1,6 +1,11 @@
 from ..state_schema import State, SegmentCard
 
 
+# State fields this node reads / writes (used by the DAG scheduler)
+READS = ()
+WRITES = ("gtm_high",)
+
+
 def run(state: State, ctx):
     state.gtm_high = SegmentCard(
         icp="Enterprise eCommerce / 3PL integrators",
@@ -1,6 +1,11 @@
 from ..state_schema import State, SegmentCard
 
 
+# State fields this node reads / writes (used by the DAG scheduler)
+READS = ()
+WRITES = ("gtm_low",)
+
+
 def run(state: State, ctx):
     state.gtm_low = SegmentCard(
         icp="SMB / emerging sellers",
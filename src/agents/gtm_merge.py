@@ -2,6 +2,11 @@ from ..state_schema import State, GTMMerged
 import hashlib
 
 
+# State fields this node reads / writes (used by the DAG scheduler)
+READS = ("gtm_high", "gtm_mid", "gtm_low", "reg_compliance", "competition", "partners")
+WRITES = ("gtm_merged",)
+
+
 def _jitter(ctx, segment: str) -> float:
     key = f"{ctx['company']['name']}|{ctx['country']}|{segment}"
     h = hashlib.md5(key.encode('utf-8')).hexdigest()
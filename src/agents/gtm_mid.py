@@ -1,6 +1,11 @@
 from ..state_schema import State, SegmentCard
 
 
+# State fields this node reads / writes (used by the DAG scheduler)
+READS = ()
+WRITES = ("gtm_mid",)
+
+
 def run(state: State, ctx):
     state.gtm_mid = SegmentCard(
         icp="Mid-market brands / regional D2C",
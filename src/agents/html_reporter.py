@@ -1,114 +1,24 @@
 import os
-from jinja2 import Template
 from ..state_schema import State
+from ..utils.templating import TEMPLATE_DIR, render_template
 
 
-HTML_TMPL = """
-<!doctype html>
-<html lang="ko">
-<head>
-  <meta charset="utf-8" />
-  <title>{{ company }} × {{ country }} Market Entry</title>
-  <style>
-    :root { --bg:#0f172a; --fg:#0b1220; --card:#ffffff; --muted:#64748b; --accent:#2563eb; }
-    body{font-family:-apple-system,BlinkMacSystemFont,'Segoe UI','Noto Sans KR','Malgun Gothic',sans-serif;margin:0;background:#f8fafc;color:#0f172a}
-    .wrap{max-width:980px;margin:24px auto;padding:0 16px}
-    .header{background:linear-gradient(135deg,#1e293b 0%,#334155 100%);color:#fff;padding:20px 24px;border-radius:12px}
-    .grid{display:grid;grid-template-columns:1fr 1fr;gap:16px}
-    .card{background:var(--card);border-radius:12px;box-shadow:0 2px 8px rgba(0,0,0,0.06);padding:16px}
-    h1{margin:0;font-size:22px}
-    h2{margin:8px 0 12px 0;font-size:18px}
-    .meta{color:#cbd5e1;margin-top:6px;font-size:13px}
-    .badge{display:inline-block;padding:2px 8px;border-radius:999px;font-size:12px;margin-left:6px;background:#e2e8f0}
-    .badge.high{background:#fee2e2;color:#991b1b}
-    .badge.mid{background:#fef3c7;color:#92400e}
-    .badge.low{background:#dcfce7;color:#14532d}
-    table{border-collapse:collapse;width:100%}
-    th,td{border:1px solid #e5e7eb;padding:6px 8px;font-size:13px}
-    th{background:#f1f5f9;text-align:left}
-    img{max-width:100%;border-radius:8px;border:1px solid #e5e7eb}
-    ul{margin:8px 0 0 18px}
-  </style>
-  <meta name="viewport" content="width=device-width,initial-scale=1" />
-  </head>
-<body>
-  <div class="wrap">
-    <div class="header">
-      <h1>{{ company }} × {{ country }} Market Entry</h1>
-      <div class="meta">Decision: <strong>{{ decision.status if decision else '' }}</strong> ({{ (decision.reason if decision else '') }})
-        <span class="badge {% if risk_badge=='High' %}high{% elif risk_badge=='Medium' %}mid{% else %}low{% endif %}">Risk {{ risk_badge or 'N/A' }}</span>
-        <span class="badge">Coverage {{ cov_pct }}%</span>
-        <span class="badge">TBD {{ tbd_pct }}%</span>
-      </div>
-    </div>
+# State fields this node reads / writes (used by the DAG scheduler)
+READS = ("market_summary", "reg_compliance", "competition", "gtm_merged", "partners", "risks", "decision")
+WRITES = ()
+# Card layout, loaded from src/templates
+HTML_TEMPLATE = "strategy_card.html.j2"
 
-    <div class="grid" style="margin-top:16px">
-      <div class="card">
-        <h2>Market</h2>
-        <div>Why Now: {{ why_now }}</div>
-        <ul>
-          {% for k,v in metrics.items() %}<li>{{k}}: {{v}}</li>{% endfor %}
-        </ul>
-        {% if market_png %}<img src="{{ market_png }}" alt="market" />{% endif %}
-      </div>
-      <div class="card">
-        <h2>Regulation</h2>
-        <div>Blocker: {{ 'Yes' if blocker else 'No' }}</div>
-        {% if customs_png %}<img src="{{ customs_png }}" alt="customs" />{% endif %}
-      </div>
-    </div>
 
-    <div class="card" style="margin-top:16px">
-      <h2>Competition</h2>
-      <ul>{% for w in whitespaces %}<li>{{ w }}</li>{% endfor %}</ul>
-      {% if heatmap %}<img src="{{ heatmap }}" alt="heatmap" />{% endif %}
-      {% if markers_map %}<img src="{{ markers_map }}" alt="markers" />{% endif %}
-    </div>
+# Template file outside State that changes this node's output (incremental cache)
+def input_files(ctx):
+    return [str(TEMPLATE_DIR / HTML_TEMPLATE)]
 
-    <div class="card" style="margin-top:16px">
-      <h2>GTM</h2>
-      <div>Selected: <strong>{{ gtm_selected }}</strong></div>
-      <table style="margin-top:8px">
-        <thead><tr><th>Segment</th><th style="text-align:right">Score</th><th>ICP</th><th>Offer</th></tr></thead>
-        <tbody>
-        {% for row in gtm_table %}
-          <tr><td>{{row.segment}}</td><td style="text-align:right">{{ '%.1f'|format(row.score) }}</td><td>{{row.icp}}</td><td>{{row.offer}}</td></tr>
-        {% endfor %}
-        </tbody>
-      </table>
-    </div>
 
-    <div class="grid" style="margin-top:16px">
-      <div class="card">
-        <h2>Partners</h2>
-        <ul>{% for p in partners %}<li>{{p.name}} ({{p.role}}) · priority={{p.priority}}</li>{% endfor %}</ul>
-        {% if partner_map %}<img src="{{ partner_map }}" alt="partner map" />{% endif %}
-      </div>
-      <div class="card">
-        <h2>Risks</h2>
-        <ul>{% for r in risks %}<li>{{r.risk}} · prob={{r.prob}} · impact={{r.impact}} · mitigation={{r.mitigation}} (trigger: {{r.trigger}})</li>{% endfor %}</ul>
-      </div>
-    </div>
-
-    <div class="card" style="margin-top:16px">
-      <h2>Decision Scorecard</h2>
-      <table>
-        <tbody>
-          <tr><td>base</td><td>{{scorecard.base}}</td></tr>
-          <tr><td>coverage</td><td>{{scorecard.cov}}</td></tr>
-          <tr><td>tbd_ratio</td><td>{{scorecard.tbd_ratio}}</td></tr>
-          <tr><td>competition_high</td><td>{{scorecard.competition_high}}</td></tr>
-          <tr><td>partners</td><td>{{scorecard.partners}}</td></tr>
-          <tr><td><strong>final</strong></td><td><strong>{{scorecard.final}}</strong></td></tr>
-        </tbody>
-      </table>
-    </div>
-
-    <div style="color:#94a3b8;font-size:12px;margin:20px 0">Generated by agentic-market-entry</div>
-  </div>
-  </body>
-  </html>
-"""
+# Files this node writes outside State (incremental cache skips only if they still exist)
+def output_files(ctx):
+    out = os.path.join(ctx["out_dir"], f"{ctx['company']['name']}_{ctx['country']}")
+    return [os.path.join(out, f"strategy_card_{ctx['company']['name']}_{ctx['country']}.html")]
 
 
 def run(state: State, ctx):
@@ -119,7 +29,8 @@ def run(state: State, ctx):
     def bn(p):
         return os.path.basename(p) if p else None
 
-    html = Template(HTML_TMPL).render(
+    html = render_template(
+        HTML_TEMPLATE,
         company=company,
         country=country,
         decision=state.decision,
@@ -1,7 +1,7 @@
-from ..state_schema import State, InputMeta, Company
+from ..state_schema import RunState, InputMeta, Company
 
 
-def run(state: State, meta):
+def run(state: RunState, meta):
     # Validate required fields; allow variable company count
     errors = []
     companies = meta.get("companies", [])
@@ -1,10 +1,24 @@
 import os
 import json
 from ..state_schema import State, MarketSummary
-from ..viz.charts import render_market_summary_png
+from ..viz.render_service import render
 
 
-def run(state: State, ctx):
+# State fields this node reads / writes (used by the DAG scheduler)
+READS = ()
+WRITES = ("market_summary", "segments_initial")
+
+
+# Env flags and data files outside State that change this node's output (incremental cache)
+ENV = ("DIAGRAM_FORMAT",)
+
+
+def input_files(ctx):
+    return [os.path.join("data", "market_overrides", f"{ctx['company']['name']}_{ctx['country']}.json")]
+
+
+def load_market_metrics(company: str, country: str):
+    """(metrics, why_now) for a case: defaults, overridden by data/market_overrides/{Company}_{Country}.json."""
     # Defaults (ensure numeric-friendly values for charts)
     metrics = {
         "TAM": "~$1.2B",
@@ -19,7 +33,7 @@ def run(state: State, ctx):
 
     # Optional override: data/market_overrides/{Company}_{Country}.json
     ov_dir = os.path.join("data", "market_overrides")
-    ov_path = os.path.join(ov_dir, f"{ctx['company']['name']}_{ctx['country']}.json")
+    ov_path = os.path.join(ov_dir, f"{company}_{country}.json")
     try:
         if os.path.exists(ov_path):
             with open(ov_path, 'r', encoding='utf-8') as f:
@@ -30,9 +44,13 @@ def run(state: State, ctx):
             why_now = data.get('why_now', why_now)
     except Exception:
         pass
-    png = render_market_summary_png(ctx["company"]["name"], ctx["country"], metrics)
+    return metrics, why_now
+
+
+def run(state: State, ctx):
+    metrics, why_now = load_market_metrics(ctx["company"]["name"], ctx["country"])
+    png = render("market_summary", ctx["company"]["name"], ctx["country"], metrics)
     state.market_summary = MarketSummary(
         metrics=metrics, why_now=why_now, market_summary_png=png
     )
     state.segments_initial = ["high", "mid", "low"]
-
@@ -1,11 +1,19 @@
+import hashlib
+import math
 import os
-from typing import Dict, Any, Tuple
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
+from loguru import logger
 
 try:
-    from jinja2 import Template
+    from ..utils.templating import TEMPLATE_DIR, render_template
 except Exception:  # pragma: no cover
-    Template = None  # type: ignore
+    render_template = None  # type: ignore
+    TEMPLATE_DIR = Path(__file__).resolve().parents[1] / "templates"
 
 
 def clamp_chars(s: str, max_chars: int) -> str:
@@ -21,11 +29,12 @@ def clamp_chars(s: str, max_chars: int) -> str:
     return s
 
 
-def _render(tmpl: str, ctx: Dict[str, Any]) -> str:
-    if Template is None:
+def _render(name: str, ctx: Dict[str, Any]) -> str:
+    # Prompt templates live in src/templates/narrative (compiled once per process)
+    if render_template is None:
         # naive fallback
-        return tmpl
-    return Template(tmpl).render(**ctx)
+        return (TEMPLATE_DIR / name).read_text(encoding="utf-8").rstrip("\n")
+    return render_template(name, **ctx)
 
 
 def _compact_table(gtm_table) -> str:
@@ -77,112 +86,189 @@ def build_prompts(case: Dict[str, Any], limits: Dict[str, int]) -> Dict[str, str
     }
 
     prompts = {}
-    prompts["exec"] = _render(
-        (
-            "[역할] 당신은 전략 컨설턴트다. 아래 데이터를 바탕으로 Executive 요약을 {{limit}}자 이내로 작성하라.\n"
-            "- 권고(status): {{decision.status}}, 최종점수: {{decision.scorecard.final}}\n"
-            "- 커버리지: {{cov_pct}}%, TBD: {{tbd_pct}}%, 리스크: {{risk_badge}}\n"
-            "- 화이트스페이스 수: {{whitespaces|length}}, 파트너 후보 수: {{partners|length}}\n"
-            "[요구] 1문단으로 판단 근거와 핵심 수치(커버리지/TBD/화이트스페이스/파트너)를 포함하고, 보수적 리스크를 한 줄로 명시하라.\n"
-            "[금지] 추상적 미사여구, 중복 문장"
-        ),
-        {**ctx, "limit": limits.get("exec", 500)},
-    )
+    prompts["exec"] = _render("narrative/exec.j2", {**ctx, "limit": limits.get("exec", 500)})
+    prompts["market"] = _render("narrative/market.j2", {**ctx, "limit": limits.get("market", 500)})
+    prompts["regulation"] = _render("narrative/regulation.j2", {**ctx, "limit": limits.get("regulation", 500)})
+    prompts["competition"] = _render("narrative/competition.j2", {**ctx, "limit": limits.get("competition", 500)})
+    prompts["gtm"] = _render("narrative/gtm.j2", {**ctx, "limit": limits.get("gtm", 500)})
+    prompts["partners"] = _render("narrative/partners.j2", {**ctx, "limit": limits.get("partners", 350)})
+    prompts["risks"] = _render("narrative/risks.j2", {**ctx, "limit": limits.get("risks", 400)})
+    prompts["overall"] = _render("narrative/overall.j2", {**ctx, "limit": limits.get("overall", 300)})
 
-    prompts["market"] = _render(
-        (
-            "TAM={{TAM}}, CAGR={{CAGR}}, 침투율={{Pen}}, 인프라={{Infra}}, 평균배송비={{Ship}}를 해석해 "
-            "초기 진입 난이도/수익성 관점의 함의를 {{limit}}자 이내 1문단으로 정리하라. 끝에 ‘Why Now: {{why_now}}’를 붙여라."
-        ),
-        {**ctx, "limit": limits.get("market", 500)},
-    )
+    prompts["plan_30"] = "30일: 규제 증빙·파트너 계약·PoC 후보 확정(숫자 포함). 120자 이내."
+    prompts["plan_60"] = "60일: PoC 진행·메시징/채널 정교화·1차 전환. 120자 이내."
+    prompts["plan_90"] = "90일: 퍼널/OTD 검증·단가 최적화·확장 여부 판정. 120자 이내."
 
-    prompts["regulation"] = _render(
-        (
-            "커버리지={{cov_pct}}%, TBD={{tbd_pct}}%, MUST 위반={{ '있음' if decision.get('scorecard',{}).get('blocker') else '없음' }}. "
-            "규제 리스크 수준과 단기 조치(증빙/정책/계약)를 {{limit}}자 이내로 정리하라. HOLD면 보류 사유와 해소 조건, RECOMMEND면 잔여 리스크와 추적 포인트를 명시하라."
-        ),
-        {**ctx, "limit": limits.get("regulation", 500)},
+    prompts["evidence"] = (
+        "규제/경쟁 근거 링크 최대 3개를 ‘영역: 제목/URL(날짜)’ 형식으로 한 줄씩 나열하라."
     )
 
-    prompts["competition"] = _render(
-        (
-            "화이트스페이스 {{ws_count}}개: {{whitespaces|join(', ')}}. "
-            "경쟁 차별화 포인트(리드타임/신뢰성/연동 등)를 {{limit}}자 이내 1문단으로 작성하라. 데이터가 부족하면 보강 계획(비교표/PoC)을 간단히 포함하라."
-        ),
-        {**ctx, "limit": limits.get("competition", 500)},
-    )
+    return prompts
 
-    prompts["gtm"] = _render(
-        (
-            "세그먼트별 점수: {{table_compact}}. 선택='{{selected}}'. 선택 사유(실행/수익성)와 초기 90일 우선순위 2가지(퍼널·파트너)를 {{limit}}자 이내 1문단으로 작성하라."
-        ),
-        {**ctx, "limit": limits.get("gtm", 500)},
-    )
 
-    prompts["partners"] = _render(
-        (
-            "파트너 후보 {{partners|length}}개. 역할/우선순위를 요약하라. 공백 영역(미확보 역할)이 있으면 보강 계획 1문장 포함. {{limit}}자 이내."
-        ),
-        {**ctx, "limit": limits.get("partners", 350)},
-    )
+SYSTEM_PROMPT = "당신은 간결하고 정확한 한국어 전략 컨설턴트다. 보고서 문체로 작성하라."
+# Default character limit per section (500 unless listed)
+DEFAULT_LIMITS = {"partners": 350, "risks": 400, "overall": 300}
 
-    prompts["risks"] = _render(
-        (
-            "상위 리스크 2-3개를 확률/영향/완화책 중심으로 {{limit}}자 이내 1문단으로 요약하라."
-        ),
-        {**ctx, "limit": limits.get("risks", 400)},
-    )
 
-    prompts["overall"] = _render(
-        (
-            "최종 권고='{{decision.status}}' 근거(규제/경쟁/GTM/파트너)와 전제 조건을 {{limit}}자 이내 결론 문장으로 작성하라."
-        ),
-        {**ctx, "limit": limits.get("overall", 300)},
-    )
+# Extra wait on top of LLM_TIMEOUT x attempts, for the client's retry backoff
+RETRY_SLACK_SECONDS = 5.0
 
-    prompts["plan_30"] = "30일: 규제 증빙·파트너 계약·PoC 후보 확정(숫자 포함). 120자 이내."
-    prompts["plan_60"] = "60일: PoC 진행·메시징/채널 정교화·1차 전환. 120자 이내."
-    prompts["plan_90"] = "90일: 퍼널/OTD 검증·단가 최적화·확장 여부 판정. 120자 이내."
 
-    prompts["evidence"] = (
-        "규제/경쟁 근거 링크 최대 3개를 ‘영역: 제목/URL(날짜)’ 형식으로 한 줄씩 나열하라."
-    )
+def _max_chars(key: str, limits: Dict[str, int]) -> int:
+    return limits.get(key, DEFAULT_LIMITS.get(key, 500))
 
-    return prompts
 
+def _max_retries() -> int:
+    return max(0, int(os.getenv("LLM_MAX_RETRIES", "1")))
 
-def _call_openai(prompt: str, model: str, api_key: str, timeout: int = 60) -> str:
-    try:
+
+class OpenAIBackend:
+    """Chat completions through one shared ``OpenAI`` client (one connection pool).
+
+    Retries are explicit (LLM_MAX_RETRIES, default 1) rather than the SDK's
+    default of 2, so one section takes at most LLM_TIMEOUT x (retries + 1).
+    """
+
+    def __init__(self, api_key: str):
         from openai import OpenAI
-        client = OpenAI(api_key=api_key)
-        resp = client.chat.completions.create(
+        self.client = OpenAI(api_key=api_key, max_retries=_max_retries())
+
+    def complete(self, prompt: str, model: str, timeout: float) -> str:
+        resp = self.client.chat.completions.create(
             model=model,
             messages=[
-                {"role": "system", "content": "당신은 간결하고 정확한 한국어 전략 컨설턴트다. 보고서 문체로 작성하라."},
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": prompt},
             ],
             temperature=0.3,
             timeout=timeout,
         )
         return (resp.choices[0].message.content or "").strip()
-    except Exception:
+
+
+class FakeBackend:
+    """Offline stand-in (LLM_BACKEND=fake): deterministic text derived from the prompt.
+
+    LLM_FAKE_DELAY (seconds) simulates request latency.
+    """
+
+    def complete(self, prompt: str, model: str, timeout: float) -> str:
+        delay = float(os.getenv("LLM_FAKE_DELAY", "0") or 0)
+        if delay:
+            time.sleep(min(delay, timeout))
+        digest = hashlib.md5(prompt.encode("utf-8")).hexdigest()[:8]
+        return f"[{model} fake {digest}] {prompt.splitlines()[0]}"
+
+
+_backend: Optional[Any] = None
+_pool: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_backend():
+    """Process-wide LLM backend per LLM_BACKEND (openai|fake); None when OpenAI has no API key."""
+    global _backend
+    with _lock:
+        if _backend is None or getattr(_backend, "_pid", None) != os.getpid():
+            if os.getenv("LLM_BACKEND", "openai").lower() == "fake":
+                _backend = FakeBackend()
+            else:
+                api_key = os.getenv("OPENAI_API_KEY")
+                if not api_key:
+                    return None
+                try:
+                    _backend = OpenAIBackend(api_key)
+                except Exception as e:
+                    logger.warning("OpenAI client unavailable: {}", e)
+                    return None
+            _backend._pid = os.getpid()
+        return _backend
+
+
+def set_backend(backend) -> None:
+    """Swap the process-wide backend (e.g. a fake in tests)."""
+    global _backend
+    with _lock:
+        _backend = backend
+        if backend is not None:
+            backend._pid = os.getpid()
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    # LLM_CONCURRENCY bounds in-flight requests across all cases of the process.
+    # Read once when the pool is created: changing it later in the same process has no effect.
+    global _pool
+    with _lock:
+        if _pool is None or getattr(_pool, "_pid", None) != os.getpid():
+            size = max(1, int(os.getenv("LLM_CONCURRENCY", "4")))
+            _pool = ThreadPoolExecutor(max_workers=size, thread_name_prefix="llm")
+            _pool._pid, _pool._size = os.getpid(), size
+        return _pool
+
+
+def _complete(backend, key: str, prompt: str, model: str, timeout: float) -> str:
+    try:
+        return backend.complete(prompt, model, timeout)
+    except Exception as e:
+        logger.warning("LLM narrative '{}' failed: {}", key, e)
         return ""
 
 
-def generate_texts(case: Dict[str, Any], model: str = None, limits: Dict[str, int] = None) -> Dict[str, str]:
+class PendingTexts:
+    """Narratives of one case whose prompts are in flight; ``result()`` blocks until all are back.
+
+    ``result()`` waits at most ``wait_timeout`` seconds in total for the whole case;
+    sections not back by then are logged and left out, so the report falls back
+    to its template text for them.
+    """
+
+    def __init__(self, futures: Dict[str, Future], limits: Dict[str, int], wait_timeout: Optional[float] = None):
+        self.futures = futures
+        self.limits = limits
+        self.wait_timeout = wait_timeout
+
+    def result(self) -> Dict[str, str]:
+        done, _ = wait(list(self.futures.values()), timeout=self.wait_timeout)
+        out: Dict[str, str] = {}
+        late = []
+        for k, fut in self.futures.items():
+            if fut not in done:
+                fut.cancel()  # frees the pool slot if the request has not started yet
+                late.append(k)
+                continue
+            txt = fut.result()
+            if txt:
+                out[k] = clamp_chars(txt, _max_chars(k, self.limits))
+        if late:
+            logger.warning("LLM narratives {} not back within {:.0f}s; using template text", late, self.wait_timeout)
+        return out
+
+
+def submit_texts(case: Optional[Dict[str, Any]], model: str = None, limits: Dict[str, int] = None) -> PendingTexts:
+    """Queue every narrative prompt of ``case`` on the shared pool and return without waiting."""
     model = model or os.getenv("LLM_MODEL", "gpt-4o-mini")
     limits = limits or {}
-    prompts = build_prompts(case, limits)
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        return {}
-    out: Dict[str, str] = {}
-    for k, p in prompts.items():
-        txt = _call_openai(p, model=model, api_key=api_key)
-        if not txt:
-            continue
-        max_chars = limits.get(k, 500 if k not in ("partners", "risks", "overall") else {"partners": 350, "risks": 400, "overall": 300}[k] if k in ("partners","risks","overall") else 500)
-        out[k] = clamp_chars(txt, max_chars)
-    return out
+    backend = get_backend() if case else None
+    if backend is None:
+        return PendingTexts({}, limits)
+    timeout = float(os.getenv("LLM_TIMEOUT", "60"))
+    pool = _get_pool()
+    futures = {
+        k: pool.submit(_complete, backend, k, p, model, timeout)
+        for k, p in build_prompts(case, limits).items()
+    }
+    # One deadline for the whole case: every prompt gets its attempts, LLM_CONCURRENCY at a time
+    per_request = timeout * (_max_retries() + 1) + RETRY_SLACK_SECONDS
+    rounds = math.ceil(len(futures) / pool._size)
+    return PendingTexts(futures, limits, per_request * rounds)
+
 
+def generate_texts_many(cases: List[Optional[Dict[str, Any]]], model: str = None, limits: Dict[str, int] = None) -> List[Dict[str, str]]:
+    """Narratives for several cases, with all of their prompts in flight at once."""
+    pending = [submit_texts(case, model, limits) for case in cases]
+    return [p.result() for p in pending]
+
+
+def generate_texts(case: Dict[str, Any], model: str = None, limits: Dict[str, int] = None) -> Dict[str, str]:
+    return submit_texts(case, model, limits).result()
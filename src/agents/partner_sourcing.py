@@ -1,10 +1,23 @@
 import csv
 import os
 from ..state_schema import State, Partners
-from ..viz.maps import render_partner_map
+from ..viz.render_service import render
+from ..utils.gazetteer import source_path
+from ..utils.geocode import geocode_key, locate
 
 
-def _load_partners(country: str):
+# State fields this node reads / writes (used by the DAG scheduler)
+READS = ()
+WRITES = ("partners",)
+# Env flags and data files outside State that change this node's output (incremental cache)
+ENV = ("USE_GOOGLE_STATIC_MAPS", "GOOGLE_MAPS_API_KEY", "GEOCODE_GAZETTEER", "MAP_FORMAT", "WEBP_QUALITY")
+
+
+def input_files(ctx):
+    return [os.path.join("data", "partners", f"{ctx['country']}.csv"), str(source_path(ctx["country"]))]
+
+
+def load_partners(country: str):
     path = os.path.join("data", "partners", f"{country}.csv")
     candidates = []
     if os.path.exists(path):
@@ -28,8 +41,17 @@ def _load_partners(country: str):
     return [c for c in candidates if c.get("name")]
 
 
+def geocode_inputs(ctx):
+    # Partner coordinates the map will use; a changed lookup invalidates the cached node
+    country = ctx["country"]
+    return {
+        geocode_key(c["name"], country): locate(c["name"], country, ctx.get("geocodes"))
+        for c in load_partners(country)
+    }
+
+
 def run(state: State, ctx):
-    candidates = _load_partners(ctx["country"])
-    png = render_partner_map(ctx["company"]["name"], ctx["country"], candidates)
+    candidates = load_partners(ctx["country"])
+    png = render("partner_map", ctx["company"]["name"], ctx["country"], candidates, ctx.get("geocodes"))
     state.partners = Partners(candidates=candidates, partner_map_png=png)
 
@@ -1,7 +1,21 @@
 import csv
 import os
 from ..state_schema import State, RegulationCompliance, RegulationItem
-from ..viz.charts import render_customs_flow_png
+from ..viz.render_service import render
+
+
+# State fields this node reads / writes (used by the DAG scheduler)
+READS = ()
+WRITES = ("reg_compliance",)
+
+
+# Env flags and data files outside State that change this node's output (incremental cache)
+ENV = ("DIAGRAM_FORMAT",)
+
+
+def input_files(ctx):
+    return [os.path.join("data", "regulation", f"{ctx['country']}.csv")]
+
 
 # Per spec: NICE is excluded from coverage (weight 0)
 WEIGHT = {"MUST": 3, "SHOULD": 2, "NICE": 0}
@@ -67,7 +81,7 @@ def _load_items(country: str):
 def run(state: State, ctx):
     items = _load_items(ctx["country"])
     cov, blocker, tbd_ratio = compute_coverage(items)
-    png = render_customs_flow_png(ctx["company"]["name"], ctx["country"])
+    png = render("customs_flow", ctx["company"]["name"], ctx["country"])
     # Risk badge heuristic
     if blocker or cov < 0.8:
         badge = "High"
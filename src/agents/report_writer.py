@@ -1,70 +1,84 @@
 import os
 import json
 from ..state_schema import State
-from jinja2 import Template
-
-
-CARD_TMPL = """# {{company}} × {{country}} Market Entry
-## Executive
-- Decision: **{{decision.status}}** ({{decision.reason}})
-- Regulation Coverage: {{cov_pct}}% (TBD {{tbd_pct}}%, Risk={{risk_badge}})
-- Chosen GTM: {{gtm_selected}}
-
-## Market
-- Why Now: {{why_now}}
-- Metrics: {{metrics}}
-{% if market_png %}
-![]({{market_png}})
-{% endif %}
-
-## Regulation
-- Blocker: {{blocker}}
-{% if customs_png %}
-![]({{customs_png}})
-{% endif %}
-
-## Competition
-- Whitespaces
-{% for w in whitespaces %}- {{w}}
-{% endfor %}
-{% if heatmap %}
-### Competition Heatmap
-![]({{heatmap}})
-{% endif %}
-{% if markers_map %}
-### Competitor Map
-![]({{markers_map}})
-{% endif %}
-
-## GTM
-- Selected: {{gtm_selected}}
-
-| Segment | Score | ICP | Offer |
-|---|---:|---|---|
-{% for row in gtm_table %}| {{row.segment}} | {{"%.1f"|format(row.score)}} | {{row.icp}} | {{row.offer}} |
-{% endfor %}
-
-## Partners
-{% for p in partners %}- {{p.name}} ({{p.role}}) · priority={{p.priority}}
-{% endfor %}
-{% if partner_map %}
-![]({{partner_map}})
-{% endif %}
-
-## Risks
-{% for r in risks %}- {{r.risk}} · prob={{r.prob}} · impact={{r.impact}} · mitigation={{r.mitigation}} (trigger: {{r.trigger}})
-{% endfor %}
-
-## Decision Scorecard
-| key | value |
-|---|---|
-| base | {{scorecard.base}} |
-| coverage | {{scorecard.cov}} |
-| tbd_ratio | {{scorecard.tbd_ratio}} |
-| competition_high | {{scorecard.competition_high}} |
-| partners | {{scorecard.partners}} |
-| final | **{{scorecard.final}}** |
-"""
+from ..utils.templating import TEMPLATE_DIR, render_template
+
+
+# State fields this node reads / writes (used by the DAG scheduler)
+READS = ("market_summary", "reg_compliance", "competition", "gtm_merged", "partners", "risks", "decision")
+WRITES = ()
+# Card layout, loaded from src/templates
+CARD_TEMPLATE = "strategy_card.md.j2"
+
+
+# Template file outside State that changes this node's output (incremental cache)
+def input_files(ctx):
+    return [str(TEMPLATE_DIR / CARD_TEMPLATE)]
+
+
+# Files this node writes outside State (incremental cache skips only if they still exist)
+def output_files(ctx):
+    out = os.path.join(ctx["out_dir"], f"{ctx['company']['name']}_{ctx['country']}")
+    return [
+        os.path.join(out, f"strategy_card_{ctx['company']['name']}_{ctx['country']}.md"),
+        os.path.join(out, "summary.json"),
+        os.path.join(out, "case_state.json"),
+    ]
+
+
+def _bn(p):
+    return os.path.basename(p) if p else None
+
+
+def summarize_case(state: State, company: str, country: str) -> dict:
+    """Index row for one case (same shape as summary.json)."""
+    cov = state.reg_compliance.coverage if state.reg_compliance else 0
+    tbd = state.reg_compliance.tbd_ratio if state.reg_compliance else 0
+    return {
+        "company": company,
+        "country": country,
+        "decision": (state.decision.status if state.decision else None),
+        "final": (state.decision.scorecard.get("final") if state.decision else None),
+        "coverage": cov,
+        "tbd_ratio": tbd,
+        "risk_badge": state.reg_compliance.risk_badge if state.reg_compliance else "",
+        "gtm_selected": state.gtm_merged.selected if state.gtm_merged else "high",
+        "card": f"strategy_card_{company}_{country}.md",
+    }
+
+
+def snapshot_case(state: State, company: str, country: str) -> dict:
+    """Rich case view for the DOCX builder (same shape as case_state.json)."""
+    cov = state.reg_compliance.coverage if state.reg_compliance else 0
+    tbd = state.reg_compliance.tbd_ratio if state.reg_compliance else 0
+    return {
+        "company": company,
+        "country": country,
+        "decision": (state.decision.dict() if state.decision else {}),
+        "coverage": cov,
+        "tbd_ratio": tbd,
+        "risk_badge": state.reg_compliance.risk_badge if state.reg_compliance else "",
+        "market": {
+            "why_now": (state.market_summary.why_now if state.market_summary else ""),
+            "metrics": (state.market_summary.metrics if state.market_summary else {}),
+        },
+        "competition": {
+            "whitespaces": (state.competition.whitespaces if state.competition else []),
+            "entities": (getattr(state.competition, 'positioning', {}).get('entities', []) if state.competition and isinstance(getattr(state.competition, 'positioning', {}), dict) else []),
+        },
+        "gtm": {
+            "table": (state.gtm_merged.table if state.gtm_merged else []),
+            "selected": state.gtm_merged.selected if state.gtm_merged else "high",
+        },
+        "partners": (state.partners.candidates if state.partners else []),
+        "risks": (state.risks.register_items if state.risks else []),
+        "images": {
+            "market": _bn(state.market_summary.market_summary_png if state.market_summary else None),
+            "customs": _bn(state.reg_compliance.customs_flow_png if state.reg_compliance else None),
+            "heatmap": _bn(state.competition.heatmap_png if state.competition else None),
+            "partner": _bn(state.partners.partner_map_png if state.partners else None),
+        },
+    }
 
 
 def run(state: State, ctx):
@@ -77,22 +91,19 @@ def run(state: State, ctx):
     badge = state.reg_compliance.risk_badge if state.reg_compliance else ""
     gtm_sel = state.gtm_merged.selected if state.gtm_merged else "high"
 
-    def bn(p):
-        return os.path.basename(p) if p else None
-
-    market_png = bn(state.market_summary.market_summary_png if state.market_summary else None)
-    customs_png = bn(state.reg_compliance.customs_flow_png if state.reg_compliance else None)
-    heatmap = bn(state.competition.heatmap_png if state.competition else None)
-    markers_map = bn(getattr(state.competition, 'markers_map_png', None) if state.competition else None)
-    partner_map = bn(state.partners.partner_map_png if state.partners else None)
+    market_png = _bn(state.market_summary.market_summary_png if state.market_summary else None)
+    customs_png = _bn(state.reg_compliance.customs_flow_png if state.reg_compliance else None)
+    heatmap = _bn(state.competition.heatmap_png if state.competition else None)
+    markers_map = _bn(getattr(state.competition, 'markers_map_png', None) if state.competition else None)
+    partner_map = _bn(state.partners.partner_map_png if state.partners else None)
 
     class Row(dict):
         __getattr__ = dict.get
 
     table = [Row(**r) for r in (state.gtm_merged.table if state.gtm_merged else [])]
 
-    t = Template(CARD_TMPL)
-    md = t.render(
+    md = render_template(
+        CARD_TEMPLATE,
         company=company,
         country=country,
         decision=state.decision,
@@ -118,49 +129,9 @@ def run(state: State, ctx):
         f.write(md)
 
     # Summary JSON for indexers
-    summary = {
-        "company": company,
-        "country": country,
-        "decision": (state.decision.status if state.decision else None),
-        "final": (state.decision.scorecard.get("final") if state.decision else None),
-        "coverage": cov,
-        "tbd_ratio": tbd,
-        "risk_badge": badge,
-        "gtm_selected": gtm_sel,
-        "card": f"strategy_card_{company}_{country}.md",
-    }
     with open(os.path.join(out, "summary.json"), "w", encoding="utf-8") as sf:
-        json.dump(summary, sf, ensure_ascii=False, indent=2)
+        json.dump(summarize_case(state, company, country), sf, ensure_ascii=False, indent=2)
 
     # Rich case state for DOCX builder
-    case_state = {
-        "company": company,
-        "country": country,
-        "decision": (state.decision.dict() if state.decision else {}),
-        "coverage": cov,
-        "tbd_ratio": tbd,
-        "risk_badge": badge,
-        "market": {
-            "why_now": (state.market_summary.why_now if state.market_summary else ""),
-            "metrics": (state.market_summary.metrics if state.market_summary else {}),
-        },
-        "competition": {
-            "whitespaces": (state.competition.whitespaces if state.competition else []),
-            "entities": (getattr(state.competition, 'positioning', {}).get('entities', []) if state.competition and isinstance(getattr(state.competition, 'positioning', {}), dict) else []),
-        },
-        "gtm": {
-            "table": (state.gtm_merged.table if state.gtm_merged else []),
-            "selected": gtm_sel,
-        },
-        "partners": (state.partners.candidates if state.partners else []),
-        "risks": (state.risks.register_items if state.risks else []),
-        "images": {
-            "market": market_png,
-            "customs": customs_png,
-            "heatmap": heatmap,
-            "partner": partner_map,
-        },
-    }
     with open(os.path.join(out, "case_state.json"), "w", encoding="utf-8") as cf:
-        json.dump(case_state, cf, ensure_ascii=False, indent=2)
-
+        json.dump(snapshot_case(state, company, country), cf, ensure_ascii=False, indent=2)
@@ -1,6 +1,11 @@
 from ..state_schema import State, Risks
 
 
+# State fields this node reads / writes (used by the DAG scheduler)
+READS = ("reg_compliance", "partners")
+WRITES = ("risks",)
+
+
 def run(state: State, ctx):
     cov = state.reg_compliance.coverage if state.reg_compliance else 0.0
     tbd = state.reg_compliance.tbd_ratio if state.reg_compliance else 0.0
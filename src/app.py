@@ -26,7 +26,7 @@ except Exception:
 from loguru import logger
 from dotenv import load_dotenv
 from src.viz.fonts import ensure_kr_font
-from src.state_schema import State
+from src.state_schema import RunState
 from src.graph.build_graph import run_pipeline
 
 
@@ -35,6 +35,10 @@ def main():
     parser.add_argument("--input", required=True, help="data/companies.json")
     parser.add_argument("--out", required=True, help="outputs/")
     parser.add_argument("--phase", default="phase1", choices=["phase1", "full"], help="pipeline phase to run")
+    parser.add_argument("--workers", type=int, default=1, help="run company x country cases in N worker processes")
+    parser.add_argument("--node-executor", default="thread", choices=["thread", "process"], help="how independent agent nodes run concurrently within a case")
+    parser.add_argument("--incremental", action="store_true", help="skip nodes whose inputs are unchanged since the last run")
+    parser.add_argument("--resume", action="store_true", help="continue an interrupted run from its node checkpoints")
     args = parser.parse_args()
 
     with open(args.input, "r", encoding="utf-8") as f:
@@ -84,9 +88,9 @@ def main():
         category=UserWarning,
     )
 
-    state = State()
+    state = RunState()
     logger.info("Starting pipeline for {} companies", len(meta.get("companies", [])))
-    run_pipeline(state, meta, args.out, phase=args.phase)
+    run_pipeline(state, meta, args.out, phase=args.phase, workers=args.workers, node_executor=args.node_executor, incremental=args.incremental, resume=args.resume)
 
 
 if __name__ == "__main__":
@@ -1,59 +1,161 @@
+import os
 from loguru import logger
-from typing import Dict, Any
-from concurrent.futures import ThreadPoolExecutor
-from ..state_schema import State
+from typing import Dict, Any, Optional
+from concurrent.futures import ProcessPoolExecutor
+from ..state_schema import State, RunState
 
 # 각 노드 import
 from ..agents.input_validation import run as input_validation
-from ..agents.market_research import run as market_research
-from ..agents.regulation_check import run as regulation_check
-from ..agents.competitor_mapping import run as competitor_mapping
-from ..agents.gtm_high import run as gtm_high
-from ..agents.gtm_mid import run as gtm_mid
-from ..agents.gtm_low import run as gtm_low
-from ..agents.gtm_merge import run as gtm_merge
-from ..agents.partner_sourcing import run as partner_sourcing
-from ..agents.risk_scenarios import run as risk_scenarios
-from ..agents.decision_maker import run as decision_maker
-from ..agents.report_writer import run as report_writer
+from ..agents import (
+    market_research,
+    regulation_check,
+    competitor_mapping,
+    gtm_high,
+    gtm_mid,
+    gtm_low,
+    gtm_merge,
+    partner_sourcing,
+    risk_scenarios,
+    decision_maker,
+    report_writer,
+    html_reporter,
+)
+from ..agents.report_writer import summarize_case
 from ..utils.output_index import build_outputs_index
 from ..agents.final_reporter import run as final_reporter
-from ..agents.html_reporter import run as html_reporter
+from .scheduler import Node, run_dag
+from .incremental import NodeCache
+from .checkpoint import CheckpointStore
+from .prefetch import prefetch_geocodes, prerender_market_summaries
+from ..utils.geocode import log_geocode_stats
+from ..viz.render_service import shutdown_render_service, wait_renders
 
 
-def run_pipeline(state: State, meta: Dict[str, Any], out_dir: str, phase: str = "phase1"):
+# Node lists per phase. Listing order only breaks ties between nodes touching the
+# same State field; everything else is scheduled from each node's READS/WRITES.
+PHASE1_NODES = [
+    Node.from_module(m)
+    for m in (market_research, regulation_check, decision_maker, report_writer, html_reporter)
+]
+FULL_NODES = [
+    Node.from_module(m)
+    for m in (
+        market_research,
+        regulation_check,
+        competitor_mapping,
+        gtm_high,
+        gtm_mid,
+        gtm_low,
+        partner_sourcing,
+        gtm_merge,
+        risk_scenarios,
+        decision_maker,
+        report_writer,
+        html_reporter,
+    )
+]
+
+
+def run_case(
+    state: State,
+    context: Dict[str, Any],
+    phase: str = "phase1",
+    executor: str = "thread",
+    cache: Optional[NodeCache] = None,
+    checkpoint: Optional[CheckpointStore] = None,
+) -> State:
+    """Run every node of one company x country case against ``state``.
+
+    Independent nodes (market/regulation/competition/partners, GTM segments)
+    run concurrently; see ``scheduler.run_dag``. With ``cache``, nodes whose
+    inputs are unchanged since the last run are skipped; with ``checkpoint``,
+    each node's State delta is logged so an interrupted run can resume.
+    """
+    nodes = PHASE1_NODES if phase == "phase1" else FULL_NODES
+    return run_dag(nodes, state, context, executor=executor, cache=cache, checkpoint=checkpoint)
+
+
+def _init_case_worker():
+    # Worker processes do not go through app.main: force the headless backend and fonts here
+    import warnings
+    import matplotlib  # type: ignore
+    matplotlib.use('Agg')
+    from ..viz.fonts import ensure_kr_font
+    ensure_kr_font()
+    warnings.filterwarnings("ignore", message=r"Glyph .* missing from font\(s\).*", category=UserWarning)
+
+
+def _run_case_worker(
+    company: Dict[str, Any],
+    country: str,
+    out_dir: str,
+    geocodes: Optional[Dict[str, Any]],
+    phase: str,
+    executor: str,
+    cache: Optional[NodeCache],
+    checkpoint: Optional[CheckpointStore],
+) -> State:
+    logger.info("Processing {} -> {} (worker)", company.get("name"), country)
+    context = {"company": company, "country": country, "out_dir": out_dir, "geocodes": geocodes}
+    state = run_case(State(), context, phase, executor, cache, checkpoint)
+    log_geocode_stats(f"worker {company.get('name')}_{country}")
+    return state
+
+
+def run_pipeline(
+    state: RunState,
+    meta: Dict[str, Any],
+    out_dir: str,
+    phase: str = "phase1",
+    workers: int = 1,
+    node_executor: str = "thread",
+    incremental: bool = False,
+    resume: bool = False,
+):
     # 입력검증
     input_validation(state, meta)
+    cache = NodeCache(out_dir) if incremental else None
+    # 노드 단위 체크포인트: --resume이면 마지막 실행의 미완료 지점부터 이어서 실행
+    checkpoint = CheckpointStore(out_dir)
+    checkpoint.begin(meta, phase, resume)
+
+    cases = [
+        (company, country)
+        for company in meta.get("companies", [])
+        for country in company.get("target_countries", [])
+    ]
+    # 지도에 필요한 (이름, 국가) 쌍을 케이스 실행 전에 한 번에 지오코딩
+    geocodes = prefetch_geocodes(meta) if phase == "full" else None
+    # BATCH_CHARTS=1: 시장 요약 차트를 하나의 Figure로 일괄 렌더링 (케이스 노드는 매니페스트 확인 후 생략)
+    if str(os.getenv('BATCH_CHARTS', '0')).lower() in ('1', 'true', 'yes'):
+        prerender_market_summaries(cases)
 
-    # 회사 루프
-    for company in meta.get("companies", []):
-        for country in company.get("target_countries", []):
+    if workers and workers > 1 and len(cases) > 1:
+        # 케이스별 프로세스 팬아웃: 각 워커는 자체 State로 한 케이스를 끝까지 실행
+        logger.info("Fanning out {} cases over {} worker processes", len(cases), workers)
+        with ProcessPoolExecutor(max_workers=min(workers, len(cases)), initializer=_init_case_worker) as ex:
+            futures = [
+                ex.submit(_run_case_worker, company, country, out_dir, geocodes, phase, node_executor, cache, checkpoint)
+                for company, country in cases
+            ]
+            # Collect in submission order so downstream output stays deterministic
+            for (company, country), fut in zip(cases, futures):
+                state.cases[(company.get("name"), country)] = fut.result()
+        logger.info("Collected {} case results", len(state.cases))
+    else:
+        # 회사 루프 (케이스마다 새 State: 이전 케이스 필드가 섞이지 않도록)
+        for company, country in cases:
             logger.info("Processing {} -> {}", company.get("name"), country)
-            context = {"company": company, "country": country, "out_dir": out_dir}
-            # Phase selection
-            if phase == "phase1":
-                market_research(state, context)
-                regulation_check(state, context)
-                decision_maker(state, context)
-                report_writer(state, context)
-                html_reporter(state, context)
-                continue
-
-            # Full pipeline
-            market_research(state, context)
-            regulation_check(state, context)
-            competitor_mapping(state, context)
-            with ThreadPoolExecutor(max_workers=3) as ex:
-                ex.submit(gtm_high, state, context)
-                ex.submit(gtm_mid, state, context)
-                ex.submit(gtm_low, state, context)
-            gtm_merge(state, context)
-            partner_sourcing(state, context)
-            risk_scenarios(state, context)
-            decision_maker(state, context)
-            report_writer(state, context)
-            html_reporter(state, context)
-    # Update outputs index at the end
-    build_outputs_index(out_dir)
+            context = {"company": company, "country": country, "out_dir": out_dir, "geocodes": geocodes}
+            run_case(state.new_case(company.get("name"), country), context, phase, node_executor, cache, checkpoint)
+    log_geocode_stats()
+    # RENDER_WORKERS>0: 렌더 서비스에 넘긴 PNG가 모두 저장된 뒤에 최종 보고서 생성
+    try:
+        wait_renders()
+    finally:
+        shutdown_render_service()
+    # Update outputs index at the end (from the in-memory aggregate)
+    summaries = [summarize_case(cs, company, country) for (company, country), cs in state.cases.items()]
+    build_outputs_index(out_dir, summaries)
     # Build final Word report
     final_reporter(state, meta, out_dir)
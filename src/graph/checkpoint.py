@@ -0,0 +1,80 @@
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict
+from loguru import logger
+from ..state_schema import State
+from .incremental import artifact_paths, dump_field
+
+
+class CheckpointStore:
+    """Append-only log of per-node State deltas, one JSONL file per case.
+
+    Each finished node appends ``{"node", "delta", "files"}`` to
+    ``{out_dir}/.checkpoints/{Company}_{Country}.jsonl``. On ``--resume`` the
+    scheduler replays logged deltas instead of re-running those nodes, so a
+    run picks up at the first incomplete node of the first incomplete case.
+    """
+
+    def __init__(self, out_dir: str):
+        self.root = Path(out_dir) / ".checkpoints"
+
+    def _path(self, ctx: Dict[str, Any]) -> Path:
+        return self.root / f"{ctx['company']['name']}_{ctx['country']}.jsonl"
+
+    def begin(self, meta: Dict[str, Any], phase: str, resume: bool) -> None:
+        """Start a run: keep the log on a matching resume, otherwise clear it."""
+        digest = hashlib.sha256(
+            json.dumps({"meta": meta, "phase": phase}, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        run_file = self.root / "run.json"
+        if resume:
+            try:
+                if json.loads(run_file.read_text(encoding="utf-8")).get("digest") == digest:
+                    logger.info("Resuming from checkpoints in {}", self.root)
+                    return
+                logger.warning("Checkpoints in {} are for a different input/phase; starting over", self.root)
+            except Exception:
+                logger.info("No usable checkpoints in {}; starting from the first case", self.root)
+        shutil.rmtree(self.root, ignore_errors=True)
+        self.root.mkdir(parents=True, exist_ok=True)
+        run_file.write_text(json.dumps({"digest": digest, "phase": phase}), encoding="utf-8")
+
+    def entries(self, ctx: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Logged entries of one case keyed by node name."""
+        entries: Dict[str, Dict[str, Any]] = {}
+        path = self._path(ctx)
+        if not path.exists():
+            return entries
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # torn last line from an interrupted write
+                    continue
+                entries[entry["node"]] = entry
+        return entries
+
+    def restore(self, node, state: State, entries: Dict[str, Dict[str, Any]]) -> bool:
+        """Apply a logged delta to ``state`` if the node finished and its files still exist."""
+        entry = entries.get(node.name)
+        if entry is None or not all(os.path.exists(p) for p in entry.get("files", [])):
+            return False
+        restored = State.model_validate(entry.get("delta", {}))
+        for field in node.writes:
+            setattr(state, field, getattr(restored, field))
+        return True
+
+    def record(self, node, state: State, ctx: Dict[str, Any]) -> None:
+        delta = {f: dump_field(getattr(state, f)) for f in node.writes}
+        files = artifact_paths(delta) + (node.output_files(ctx) if node.output_files else [])
+        line = json.dumps({"node": node.name, "delta": delta, "files": files}, ensure_ascii=False)
+        path = self._path(ctx)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from loguru import logger
+from ..state_schema import State
+
+
+ARTIFACT_SUFFIXES = (".png", ".svg", ".pdf", ".webp")
+
+
+def _file_bytes(path: str) -> bytes:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return b"<missing>"
+
+
+def dump_field(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if isinstance(value, list):
+        return [dump_field(v) for v in value]
+    return value
+
+
+def artifact_paths(value: Any) -> List[str]:
+    """Collect rendered file paths (PNG/SVG/PDF/WebP) referenced anywhere in a dumped State field."""
+    if isinstance(value, str):
+        return [value] if value.lower().endswith(ARTIFACT_SUFFIXES) else []
+    if isinstance(value, dict):
+        return [p for v in value.values() for p in artifact_paths(v)]
+    if isinstance(value, list):
+        return [p for v in value for p in artifact_paths(v)]
+    return []
+
+
+class NodeCache:
+    """Per-case store of node outputs keyed by a fingerprint of everything the node reads.
+
+    The fingerprint covers the node's source file, the company record and country,
+    the declared ENV flags, the contents of ``input_files(ctx)``, the coordinates
+    returned by ``geocode_inputs(ctx)`` and the upstream State fields in READS. Records live under ``{out_dir}/.cache/nodes``.
+    """
+
+    def __init__(self, out_dir: str):
+        self.root = Path(out_dir) / ".cache" / "nodes"
+
+    def _path(self, node, ctx: Dict[str, Any]) -> Path:
+        return self.root / f"{ctx['company']['name']}_{ctx['country']}" / f"{node.name}.json"
+
+    def fingerprint(self, node, state: State, ctx: Dict[str, Any]) -> str:
+        h = hashlib.sha256()
+
+        def feed(label: str, payload: bytes):
+            h.update(label.encode("utf-8") + b"\0" + payload + b"\0")
+
+        feed("node", node.name.encode("utf-8"))
+        if node.source:
+            feed("source", _file_bytes(node.source))
+        feed("company", json.dumps(ctx["company"], sort_keys=True, ensure_ascii=False).encode("utf-8"))
+        feed("country", str(ctx["country"]).encode("utf-8"))
+        for name in node.env:
+            feed(f"env:{name}", os.getenv(name, "").encode("utf-8"))
+        for path in (node.input_files(ctx) if node.input_files else []):
+            feed(f"file:{path}", _file_bytes(path))
+        if node.geocode_inputs:
+            geocodes = node.geocode_inputs(ctx)
+            feed("geocodes", json.dumps(geocodes, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+        for field in node.reads:
+            dumped = dump_field(getattr(state, field))
+            feed(f"state:{field}", json.dumps(dumped, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+        return h.hexdigest()
+
+    def restore(self, node, state: State, ctx: Dict[str, Any], fingerprint: Optional[str]) -> bool:
+        """Apply the stored WRITES to ``state`` if the record matches and its files still exist."""
+        path = self._path(node, ctx)
+        if fingerprint is None or not path.exists():
+            return False
+        try:
+            record = json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            return False
+        if record.get("fingerprint") != fingerprint:
+            return False
+        if not all(os.path.exists(p) for p in record.get("files", [])):
+            return False
+        restored = State.model_validate(record.get("outputs", {}))
+        for field in node.writes:
+            setattr(state, field, getattr(restored, field))
+        return True
+
+    def store(self, node, state: State, ctx: Dict[str, Any], fingerprint: Optional[str]) -> None:
+        if fingerprint is None:
+            return
+        outputs = {f: dump_field(getattr(state, f)) for f in node.writes}
+        files = artifact_paths(outputs) + (node.output_files(ctx) if node.output_files else [])
+        record = {"node": node.name, "fingerprint": fingerprint, "outputs": outputs, "files": files}
+        path = self._path(node, ctx)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(record, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning("Could not store node cache {}: {}", path, e)
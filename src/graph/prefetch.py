@@ -0,0 +1,58 @@
+from typing import Any, Dict, List, Optional, Tuple
+from loguru import logger
+from ..agents.market_research import load_market_metrics
+from ..agents.partner_sourcing import load_partners
+from ..utils.competitor_data import load_competitor_entities
+from ..utils.geocode import geocode_batch
+from ..viz.charts import render_market_summaries
+from ..viz.maps import competition_entity_names
+
+
+def collect_geocode_pairs(meta: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """Every (name, country) the full pipeline's maps will place, deduplicated in first-seen order.
+
+    Mirrors competitor_mapping (company + competitor CSVs + ``*_entities.txt``)
+    and partner_sourcing (``data/partners/{country}.csv``).
+    """
+    seen = set()
+    pairs: List[Tuple[str, str]] = []
+
+    def add(name: Optional[str], country: str):
+        if name and (name, country) not in seen:
+            seen.add((name, country))
+            pairs.append((name, country))
+
+    for company in meta.get("companies", []):
+        name = company.get("name")
+        for country in company.get("target_countries", []):
+            comps = load_competitor_entities(name, country) or None
+            for ent in competition_entity_names(name, country, comps):
+                add(ent, country)
+            for partner in load_partners(country):
+                add(partner.get("name"), country)
+    return pairs
+
+
+def prefetch_geocodes(meta: Dict[str, Any]) -> Dict[str, Optional[Tuple[float, float]]]:
+    """Resolve all map names of the run in one batch ahead of the per-case renderers."""
+    pairs = collect_geocode_pairs(meta)
+    table = geocode_batch(pairs)
+    logger.info(
+        "Geocode pre-pass: {} unique names resolved ({} located)",
+        len(table), sum(1 for v in table.values() if v),
+    )
+    return table
+
+
+def prerender_market_summaries(cases: List[Tuple[Dict[str, Any], str]]) -> List[str]:
+    """Draw every case's market summary chart in one figure session ahead of the case loop.
+
+    The per-case ``market_research`` renders then find a current manifest and skip.
+    """
+    jobs = []
+    for company, country in cases:
+        name = company.get("name")
+        jobs.append((name, country, load_market_metrics(name, country)[0]))
+    paths = render_market_summaries(jobs)
+    logger.info("Batch-rendered market summaries for {} cases", len(paths))
+    return paths
@@ -0,0 +1,180 @@
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from types import ModuleType
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+from loguru import logger
+from ..state_schema import State
+from ..viz.render_service import track_renders
+from .incremental import NodeCache
+from .checkpoint import CheckpointStore
+
+
+class Node(NamedTuple):
+    name: str
+    fn: Callable
+    reads: Tuple[str, ...] = ()
+    writes: Tuple[str, ...] = ()
+    env: Tuple[str, ...] = ()
+    input_files: Optional[Callable[[Dict[str, Any]], List[str]]] = None
+    output_files: Optional[Callable[[Dict[str, Any]], List[str]]] = None
+    source: Optional[str] = None
+    geocode_inputs: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None
+
+    @classmethod
+    def from_module(cls, module: ModuleType) -> "Node":
+        """Build a node from an agent module exposing ``run``, ``READS`` and ``WRITES``.
+
+        Optional ``ENV``, ``input_files(ctx)``, ``output_files(ctx)`` and
+        ``geocode_inputs(ctx)`` feed the incremental cache (see ``incremental.NodeCache``).
+        """
+        return cls(
+            name=module.__name__.rsplit(".", 1)[-1],
+            fn=module.run,
+            reads=tuple(getattr(module, "READS", ())),
+            writes=tuple(getattr(module, "WRITES", ())),
+            env=tuple(getattr(module, "ENV", ())),
+            input_files=getattr(module, "input_files", None),
+            output_files=getattr(module, "output_files", None),
+            source=getattr(module, "__file__", None),
+            geocode_inputs=getattr(module, "geocode_inputs", None),
+        )
+
+
+def build_dependencies(nodes: Sequence[Node]) -> Dict[str, Set[str]]:
+    """Derive edges from declared State fields, keeping the listed order for conflicts.
+
+    A node waits for every earlier node that writes a field it reads or writes
+    (RAW/WAW) and for every earlier node that reads a field it writes (WAR).
+    Nodes that touch disjoint fields get no edge and may run concurrently.
+    """
+    deps: Dict[str, Set[str]] = {}
+    for i, node in enumerate(nodes):
+        touched = set(node.reads) | set(node.writes)
+        deps[node.name] = {
+            prev.name
+            for prev in nodes[:i]
+            if set(prev.writes) & touched or set(prev.reads) & set(node.writes)
+        }
+    return deps
+
+
+def _run_isolated(fn: Callable, fields: Dict[str, Any], writes: Tuple[str, ...], ctx: Dict[str, Any]) -> Dict[str, Any]:
+    # Process mode: run against a private State holding only the declared inputs
+    state = State(**fields)
+    fn(state, ctx)
+    return {f: getattr(state, f) for f in writes}
+
+
+def _run_tracked(fn: Callable, state: State, ctx: Dict[str, Any]) -> List[Future]:
+    # Thread mode: run in place and hand back the renders the node queued (RENDER_WORKERS>0)
+    with track_renders() as renders:
+        fn(state, ctx)
+    return list(renders)
+
+
+def _renders_ok(node: Node, renders: List[Future]) -> bool:
+    failed = [f for f in renders if f.exception() is not None]
+    if failed:
+        logger.warning("Node {}: {} queued render(s) failed; not caching its output", node.name, len(failed))
+    return not failed
+
+
+def run_dag(
+    nodes: Sequence[Node],
+    state: State,
+    ctx: Dict[str, Any],
+    executor: str = "thread",
+    max_workers: Optional[int] = None,
+    cache: Optional[NodeCache] = None,
+    checkpoint: Optional[CheckpointStore] = None,
+) -> State:
+    """Run ``nodes`` against ``state``, launching each node as soon as its inputs are ready.
+
+    ``executor`` is ``"thread"`` (nodes mutate ``state`` directly) or ``"process"``
+    (nodes receive a copy of their READS and only their WRITES are merged back).
+    With ``cache``, nodes whose input fingerprint matches a stored result are
+    skipped and their stored WRITES are restored instead. With ``checkpoint``,
+    every finished node's delta is logged and nodes already logged by an
+    interrupted run are replayed rather than re-run. A node that queued renders
+    on the render service is stored/logged only after those renders finish
+    (at the latest before ``run_dag`` returns), so neither store can point at
+    PNGs that were never written.
+    """
+    deps = build_dependencies(nodes)
+    by_name = {n.name: n for n in nodes}
+    done: Set[str] = set()
+    pending: Dict[Any, Tuple[Node, Optional[str]]] = {}
+    waiting: List[Node] = list(nodes)
+    logged = checkpoint.entries(ctx) if checkpoint else {}
+    # (node, fingerprint, snapshot of its WRITES, queued render futures) awaiting store/record
+    deferred: List[Tuple[Node, Optional[str], State, List[Future]]] = []
+
+    def persist(node: Node, fp: Optional[str], snapshot: State) -> None:
+        if cache:
+            cache.store(node, snapshot, ctx, fp)
+        if checkpoint:
+            checkpoint.record(node, snapshot, ctx)
+
+    def flush(block: bool = False) -> None:
+        for item in list(deferred):
+            node, fp, snapshot, renders = item
+            if block:
+                wait(renders)
+            elif not all(f.done() for f in renders):
+                continue
+            deferred.remove(item)
+            if _renders_ok(node, renders):
+                persist(node, fp, snapshot)
+
+    pool_cls = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+    with pool_cls(max_workers=max_workers or max(1, len(nodes))) as ex:
+        while waiting or pending:
+            # Cache hits complete immediately and may unblock further nodes
+            progressed = True
+            while progressed:
+                progressed = False
+                for node in [n for n in waiting if deps[n.name] <= done]:
+                    waiting.remove(node)
+                    if checkpoint and checkpoint.restore(node, state, logged):
+                        logger.info("Node {} replayed from checkpoint", node.name)
+                        done.add(node.name)
+                        progressed = True
+                        continue
+                    fp = cache.fingerprint(node, state, ctx) if cache else None
+                    if cache and cache.restore(node, state, ctx, fp):
+                        logger.info("Node {} unchanged, reusing cached output", node.name)
+                        if checkpoint:
+                            checkpoint.record(node, state, ctx)
+                        done.add(node.name)
+                        progressed = True
+                        continue
+                    if executor == "process":
+                        fields = {f: getattr(state, f) for f in node.reads if getattr(state, f) is not None}
+                        fut = ex.submit(_run_isolated, node.fn, fields, node.writes, ctx)
+                    else:
+                        fut = ex.submit(_run_tracked, node.fn, state, ctx)
+                    pending[fut] = (node, fp)
+            if not pending:
+                if waiting:
+                    raise RuntimeError(f"Unsatisfiable node dependencies: {[n.name for n in waiting]}")
+                break
+
+            finished, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for fut in finished:
+                node, fp = pending.pop(fut)
+                result = fut.result()
+                renders: List[Future] = []
+                if executor == "process":
+                    for f, value in result.items():
+                        setattr(state, f, value)
+                else:
+                    renders = result
+                if renders and (cache or checkpoint):
+                    # Renders still queued: keep this node's outputs and store them once the PNGs exist
+                    deferred.append((node, fp, state.model_copy(), renders))
+                else:
+                    persist(node, fp, state)
+                done.add(node.name)
+                logger.debug("Node {} done ({}/{})", node.name, len(done), len(by_name))
+            flush()
+    flush(block=True)
+    return state
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any, Union
+from typing import List, Optional, Dict, Any, Tuple, Union
 
 
 class Company(BaseModel):
@@ -97,3 +97,17 @@ class State(BaseModel):
     decision: Optional[Decision] = None
     artifacts: Dict[str, str] = {}
 
+
+
+class RunState(BaseModel):
+    """Run-level aggregate: validated input plus one isolated State per case."""
+    input_meta: Optional[InputMeta] = None
+    cases: Dict[Tuple[str, str], State] = {}
+
+    def new_case(self, company: str, country: str) -> State:
+        state = State()
+        self.cases[(company, country)] = state
+        return state
+
+    def get_case(self, company: str, country: str) -> Optional[State]:
+        return self.cases.get((company, country))
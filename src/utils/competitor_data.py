@@ -3,13 +3,16 @@ from pathlib import Path
 from typing import List, Dict
 
 
+COMPETITION_DIR = Path(__file__).resolve().parents[2] / "data" / "rag_corpus" / "competition"
+
+
 def load_competitor_entities(company: str, country: str) -> List[Dict[str, str]]:
     """Load competitor entities from CSVs under data/rag_corpus/competition.
 
     Expected header: company,target_market,competitor,category,homepage
     Returns list of dicts with keys: name, category, homepage.
     """
-    base = Path(__file__).resolve().parents[3] / "data" / "rag_corpus" / "competition"
+    base = COMPETITION_DIR
     entities: List[Dict[str, str]] = []
     if not base.exists():
         return entities
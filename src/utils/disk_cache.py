@@ -0,0 +1,25 @@
+from pathlib import Path
+from typing import Optional, Tuple
+
+
+def trim_cache_dir(directory: Path, max_bytes: int, keep: Optional[Path] = None, patterns: Tuple[str, ...] = ("*.png",)) -> None:
+    """Delete least recently used files (by mtime; hits should touch) until ``directory`` fits ``max_bytes``."""
+    files = []
+    for pattern in patterns:
+        for p in directory.glob(pattern):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, p))
+    total = sum(size for _, size, _ in files)
+    for _, size, p in sorted(files, key=lambda t: t[0]):
+        if total <= max_bytes:
+            break
+        if p == keep:
+            continue
+        try:
+            p.unlink()
+            total -= size
+        except OSError:
+            pass
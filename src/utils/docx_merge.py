@@ -0,0 +1,162 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import zipfile
+from typing import Dict, Iterable, List, Tuple
+from xml.sax.saxutils import quoteattr
+from lxml import etree
+
+
+DOCUMENT = "word/document.xml"
+DOCUMENT_RELS = "word/_rels/document.xml.rels"
+CONTENT_TYPES = "[Content_Types].xml"
+
+NS = {
+    "w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "wp": "http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing",
+    "pic": "http://schemas.openxmlformats.org/drawingml/2006/picture",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+    "ct": "http://schemas.openxmlformats.org/package/2006/content-types",
+}
+IMAGE_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/image"
+IMAGE_TYPES = {"png": "image/png", "jpeg": "image/jpeg", "jpg": "image/jpeg", "gif": "image/gif", "bmp": "image/bmp", "tiff": "image/tiff"}
+_R_ATTRS = ("{%s}embed" % NS["r"], "{%s}link" % NS["r"], "{%s}id" % NS["r"])
+_MARKER = "DOCX-MERGE-SECTIONS"
+
+
+def _rels(zf: zipfile.ZipFile) -> List[Tuple[str, str, str, str]]:
+    root = etree.fromstring(zf.read(DOCUMENT_RELS))
+    return [
+        (r.get("Id"), r.get("Type"), r.get("Target"), r.get("TargetMode") or "")
+        for r in root.iterfind("rel:Relationship", NS)
+    ]
+
+
+def _split_document(zf: zipfile.ZipFile) -> Tuple[bytes, bytes]:
+    # Base document.xml with a marker before its final sectPr -> (head, tail) around the sections
+    root = etree.fromstring(zf.read(DOCUMENT))
+    body = root.find("w:body", NS)
+    sect = body.find("w:sectPr", NS)
+    marker = etree.Comment(_MARKER)
+    if sect is not None:
+        sect.addprevious(marker)
+    else:
+        body.append(marker)
+    xml = etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+    head, tail = xml.split(f"<!--{_MARKER}-->".encode("utf-8"))
+    return head, tail
+
+
+class _Merger:
+    def __init__(self, base: zipfile.ZipFile, out: zipfile.ZipFile, body):
+        self.out = out
+        self.body = body
+        self.rels = _rels(base)
+        self.shared = {rid for rid, _, _, _ in self.rels}
+        self.media: Dict[Tuple[str, str], str] = {}
+        self.media_exts = set()
+        self.n_media = 0
+        self.n_rels = 0
+        self.n_shapes = 0
+
+    def _new_rid(self) -> str:
+        self.n_rels += 1
+        return f"rIdM{self.n_rels}"
+
+    def _copy_media(self, src: zipfile.ZipFile, target: str) -> str:
+        # Identical images across sections share one media part
+        member = os.path.normpath(os.path.join("word", target)).replace(os.sep, "/")
+        ext = os.path.splitext(target)[1].lstrip(".").lower()
+        digest = hashlib.sha256()
+        with src.open(member) as fin:
+            for chunk in iter(lambda: fin.read(1 << 16), b""):
+                digest.update(chunk)
+        key = (digest.hexdigest(), ext)
+        if key in self.media:
+            return self.media[key]
+        self.n_media += 1
+        name = f"media/image{self.n_media}.{ext}"
+        with src.open(member) as fin, self.out.open("word/" + name, "w") as fout:
+            shutil.copyfileobj(fin, fout)
+        self.media[key] = name
+        self.media_exts.add(ext)
+        return name
+
+    def add_section(self, path: str) -> None:
+        with zipfile.ZipFile(path) as src:
+            remap: Dict[str, str] = {}
+            for rid, rtype, target, mode in _rels(src):
+                if rtype == IMAGE_REL and mode != "External":
+                    new = self._new_rid()
+                    self.rels.append((new, rtype, self._copy_media(src, target), ""))
+                    remap[rid] = new
+                elif mode == "External":
+                    new = self._new_rid()
+                    self.rels.append((new, rtype, target, mode))
+                    remap[rid] = new
+                elif rid not in self.shared:
+                    raise ValueError(f"{path}: relationship {rid} ({rtype}) not in the base template")
+            body = etree.fromstring(src.read(DOCUMENT)).find("w:body", NS)
+        for el in body:
+            if el.tag == "{%s}sectPr" % NS["w"]:
+                continue
+            for node in el.iter():
+                for attr in _R_ATTRS:
+                    rid = node.get(attr)
+                    if rid in remap:
+                        node.set(attr, remap[rid])
+            # Drawing ids restart at 1 in every section; Word wants them unique per document
+            for node in el.iter("{%s}docPr" % NS["wp"], "{%s}cNvPr" % NS["pic"]):
+                self.n_shapes += 1
+                node.set("id", str(self.n_shapes))
+            self.body.write(etree.tostring(el, encoding="UTF-8"))
+
+    def rels_xml(self) -> bytes:
+        parts = [f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<Relationships xmlns="{NS["rel"]}">']
+        for rid, rtype, target, mode in self.rels:
+            extra = ' TargetMode="External"' if mode == "External" else ""
+            parts.append(f"<Relationship Id={quoteattr(rid)} Type={quoteattr(rtype)} Target={quoteattr(target)}{extra}/>")
+        parts.append("</Relationships>")
+        return "".join(parts).encode("utf-8")
+
+    def content_types_xml(self, base: zipfile.ZipFile) -> bytes:
+        root = etree.fromstring(base.read(CONTENT_TYPES))
+        known = {d.get("Extension").lower() for d in root.iterfind("ct:Default", NS)}
+        for ext in sorted(self.media_exts - known):
+            el = etree.SubElement(root, "{%s}Default" % NS["ct"])
+            el.set("Extension", ext)
+            el.set("ContentType", IMAGE_TYPES.get(ext, "application/octet-stream"))
+        return etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+
+def merge_sections(base_path: str, section_paths: Iterable[str], out_path: str) -> str:
+    """Append the bodies of ``section_paths`` (in order) to ``base_path`` and write ``out_path``.
+
+    All inputs must come from the same python-docx template, so styles, numbering
+    and settings are taken from the base package. Sections are read one at a time,
+    images are streamed between the zip files (one media part per distinct
+    content) and the combined document.xml is spooled to disk, so memory stays
+    at roughly one section regardless of count.
+    """
+    with zipfile.ZipFile(base_path) as base, \
+            tempfile.TemporaryFile() as body, \
+            zipfile.ZipFile(out_path, "w", zipfile.ZIP_DEFLATED) as out:
+        head, tail = _split_document(base)
+        merger = _Merger(base, out, body)
+        for path in section_paths:
+            merger.add_section(path)
+        out.writestr(CONTENT_TYPES, merger.content_types_xml(base))
+        for info in base.infolist():
+            if info.filename in (DOCUMENT, DOCUMENT_RELS, CONTENT_TYPES):
+                continue
+            with base.open(info) as fin, out.open(info.filename, "w") as fout:
+                shutil.copyfileobj(fin, fout)
+        out.writestr(DOCUMENT_RELS, merger.rels_xml())
+        body.seek(0)
+        with out.open(DOCUMENT, "w") as fout:
+            fout.write(head)
+            shutil.copyfileobj(body, fout)
+            fout.write(tail)
+    return out_path
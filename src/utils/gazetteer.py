@@ -0,0 +1,184 @@
+import csv
+import difflib
+import mmap
+import os
+import re
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from loguru import logger
+
+
+GAZETTEER_DIR = Path(__file__).resolve().parents[2] / "data" / "gazetteer"
+INDEX_DIR = Path(__file__).resolve().parents[2] / "artifacts" / "cache" / "gazetteer"
+
+# Trailing legal-form tokens dropped before matching ("CJ Logistics Co., Ltd." -> "cj logistics")
+_SUFFIXES = {"inc", "corp", "corporation", "co", "ltd", "llc", "plc", "kk", "gmbh", "company", "주식회사"}
+_PUNCT = re.compile(r"[^\w\s]+")
+_SPACE = re.compile(r"\s+")
+
+Entry = Tuple[str, float, float, str]  # (name, lat, lng, kind)
+
+
+def normalize(name: str) -> str:
+    text = unicodedata.normalize("NFKC", name or "").casefold()
+    text = _SPACE.sub(" ", _PUNCT.sub(" ", text)).strip()
+    tokens = text.split(" ")
+    while len(tokens) > 1 and tokens[-1] in _SUFFIXES:
+        tokens.pop()
+    return " ".join(tokens)
+
+
+def source_path(country: str) -> Path:
+    return GAZETTEER_DIR / f"{country.upper()}.csv"
+
+
+def _build_index(src: Path, dst: Path) -> None:
+    """Compile ``data/gazetteer/{CC}.csv`` into a sorted ``key\\tname\\tlat\\tlng\\tkind`` line file.
+
+    Every name and alias becomes one line keyed by its normalized form, so a
+    lookup is a binary search over the memory-mapped file.
+    """
+    lines = set()
+    with open(src, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            name = (row.get("name") or "").strip()
+            try:
+                lat, lng = float(row["lat"]), float(row["lng"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            kind = (row.get("kind") or "").strip()
+            aliases = [a for a in (row.get("aliases") or "").split("|") if a.strip()]
+            for label in [name] + aliases:
+                key = normalize(label)
+                if key:
+                    lines.add(f"{key}\t{name}\t{lat:.6f}\t{lng:.6f}\t{kind}\n".encode("utf-8"))
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.writelines(sorted(lines))
+    os.replace(tmp, dst)
+    logger.info("Built gazetteer index {} ({} keys)", dst.name, len(lines))
+
+
+class GazetteerIndex:
+    """Read-only, memory-mapped view of one country's compiled gazetteer."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+    def _parse(self, start: int) -> Tuple[bytes, Entry, int]:
+        end = self._mm.find(b"\n", start)
+        end = len(self._mm) if end < 0 else end
+        key, name, lat, lng, kind = self._mm[start:end].decode("utf-8").split("\t")
+        return key.encode("utf-8"), (name, float(lat), float(lng), kind), end + 1
+
+    def _bisect(self, key: bytes) -> int:
+        # Offset of the first line whose key is >= ``key``; lo/hi always sit on line starts
+        lo, hi = 0, len(self._mm)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = self._mm.rfind(b"\n", 0, mid) + 1
+            line_key, _, nxt = self._parse(start)
+            if line_key < key:
+                lo = nxt
+            else:
+                hi = start
+        return lo
+
+    def _scan(self, prefix: bytes) -> Iterator[Tuple[str, Entry]]:
+        if self._mm is None:
+            return
+        pos = self._bisect(prefix)
+        while pos < len(self._mm):
+            key, entry, pos = self._parse(pos)
+            if not key.startswith(prefix):
+                return
+            yield key.decode("utf-8"), entry
+
+    def exact(self, name: str) -> Optional[Entry]:
+        key = normalize(name)
+        for k, entry in self._scan(key.encode("utf-8")):
+            if k == key:
+                return entry
+            break
+        return None
+
+    def prefix(self, text: str, limit: int = 10) -> List[Entry]:
+        """Entries whose normalized name or alias starts with ``text`` (distinct places)."""
+        out: Dict[str, Entry] = {}
+        for _, entry in self._scan(normalize(text).encode("utf-8")):
+            out.setdefault(entry[0], entry)
+            if len(out) >= limit:
+                break
+        return list(out.values())
+
+    def fuzzy(self, name: str, cutoff: float = 0.88, n: int = 3) -> List[Entry]:
+        """Close matches by ``difflib`` ratio, among keys sharing the first character."""
+        key = normalize(name)
+        if not key:
+            return []
+        candidates = dict(self._scan(key[0].encode("utf-8")))
+        return [candidates[k] for k in difflib.get_close_matches(key, list(candidates), n=n, cutoff=cutoff)]
+
+    def lookup(self, name: str) -> Optional[Entry]:
+        """Exact match, else a unique prefix match, else the closest fuzzy match."""
+        hit = self.exact(name)
+        if hit:
+            return hit
+        if len(normalize(name)) >= 4:
+            hits = self.prefix(name, limit=2)
+            if len(hits) == 1:
+                return hits[0]
+        hits = self.fuzzy(name, cutoff=float(os.getenv("GAZETTEER_FUZZY_CUTOFF", "0.88")), n=1)
+        return hits[0] if hits else None
+
+
+_indexes: Dict[str, Optional[GazetteerIndex]] = {}
+_indexes_pid: Optional[int] = None
+_indexes_lock = threading.Lock()
+
+
+def get_index(country: str) -> Optional[GazetteerIndex]:
+    """Per-process index for ``country``; (re)compiled when the CSV is newer than the index."""
+    global _indexes_pid
+    code = (country or "").upper()
+    with _indexes_lock:
+        if _indexes_pid != os.getpid():
+            _indexes.clear()
+            _indexes_pid = os.getpid()
+        if code in _indexes:
+            return _indexes[code]
+        src = source_path(code)
+        dst = INDEX_DIR / f"{code}.idx"
+        index = None
+        if code and src.exists():
+            try:
+                if not dst.exists() or dst.stat().st_mtime < src.stat().st_mtime:
+                    _build_index(src, dst)
+                index = GazetteerIndex(dst)
+            except (OSError, ValueError) as e:
+                logger.warning("Gazetteer for {} unavailable: {}", code, e)
+        _indexes[code] = index
+        return index
+
+
+def use_gazetteer() -> bool:
+    return str(os.getenv("GEOCODE_GAZETTEER", "1")).lower() in ("1", "true", "yes")
+
+
+def gazetteer_lookup(name: str, country: Optional[str]) -> Optional[Tuple[float, float]]:
+    """Resolve ``name`` from the local gazetteer of ``country`` without any network call."""
+    if not name or not country or not use_gazetteer():
+        return None
+    index = get_index(country)
+    entry = index.lookup(name) if index else None
+    if entry is None:
+        return None
+    if normalize(entry[0]) != normalize(name):
+        logger.debug("Gazetteer matched '{}' to '{}' ({})", name, entry[0], country)
+    return entry[1], entry[2]
@@ -1,84 +1,361 @@
 import json
 import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional, Tuple
-import requests
+from typing import Dict, Iterable, Optional, Tuple
 from loguru import logger
+from .gazetteer import gazetteer_lookup
+from .geocode_client import PROVIDER_ERROR, get_client
 
 
-CACHE_PATH = Path(__file__).resolve().parents[2] / "artifacts" / "cache" / "geocode_cache.json"
+CACHE_DIR = Path(__file__).resolve().parents[2] / "artifacts" / "cache"
+CACHE_PATH = CACHE_DIR / "geocode_cache.json"  # legacy JSON cache, migrated once into DB_PATH
+DB_PATH = CACHE_DIR / "geocode_cache.sqlite"
 
+# Positive entries are refreshed after GEOCODE_TTL_DAYS; names the providers answered
+# "no match" for are not retried before GEOCODE_MISS_TTL_HOURS have passed. Provider
+# errors (HTTP 429/5xx, network) only back off for GEOCODE_ERROR_TTL_MINUTES, so an
+# offline run pays for each unknown name once per backoff rather than on every run.
+DEFAULT_TTL_DAYS = 90
+DEFAULT_MISS_TTL_HOURS = 24
+DEFAULT_ERROR_TTL_MINUTES = 60
 
-def _load_cache() -> dict:
-    if CACHE_PATH.exists():
+_local = threading.local()
+# Legacy import runs once per process, not on every new per-thread connection
+_migrated_pid: Optional[int] = None
+_migrate_lock = threading.Lock()
+
+
+def _ttl_seconds() -> float:
+    return float(os.getenv("GEOCODE_TTL_DAYS", DEFAULT_TTL_DAYS)) * 86400
+
+
+def _miss_ttl_seconds() -> float:
+    return float(os.getenv("GEOCODE_MISS_TTL_HOURS", DEFAULT_MISS_TTL_HOURS)) * 3600
+
+
+def _error_ttl_seconds() -> float:
+    return float(os.getenv("GEOCODE_ERROR_TTL_MINUTES", DEFAULT_ERROR_TTL_MINUTES)) * 60
+
+
+def _connect() -> sqlite3.Connection:
+    """Per-thread (and per-process) connection to the geocode DB, created on first use."""
+    global _migrated_pid
+    conn = getattr(_local, "conn", None)
+    if conn is not None and getattr(_local, "pid", None) == os.getpid():
+        return conn
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(DB_PATH), timeout=30)
+    # WAL: readers never block the single writer, safe across worker processes
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    # lat/lng NULL = negative entry; resolved_at = when coordinates were obtained,
+    # checked_at = last definitive provider answer, error_at = last provider error since then
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS places ("
+        "key TEXT PRIMARY KEY, lat REAL, lng REAL, provider TEXT, resolved_at REAL, checked_at REAL NOT NULL, error_at REAL)"
+    )
+    if "error_at" not in {row[1] for row in conn.execute("PRAGMA table_info(places)")}:
+        try:
+            conn.execute("ALTER TABLE places ADD COLUMN error_at REAL")
+        except sqlite3.OperationalError:
+            pass  # added by another process meanwhile
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+    conn.commit()
+    with _migrate_lock:
+        if _migrated_pid != os.getpid():
+            _migrate_legacy(conn)
+            _migrated_pid = os.getpid()
+    _local.conn, _local.pid = conn, os.getpid()
+    return conn
+
+
+def _migrate_legacy(conn: sqlite3.Connection) -> None:
+    # One-time imports, idempotent across processes: the pre-TTL `geocode` table and geocode_cache.json
+    now = time.time()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'geocode'").fetchone():
+            conn.execute(
+                "INSERT OR IGNORE INTO places (key, lat, lng, provider, resolved_at, checked_at) "
+                "SELECT key, lat, lng, 'legacy', ?, ? FROM geocode",
+                (now, now),
+            )
+            conn.execute("DROP TABLE geocode")
+        if not CACHE_PATH.exists() or conn.execute("SELECT 1 FROM meta WHERE name = 'json_migrated'").fetchone():
+            return
         try:
-            return json.loads(CACHE_PATH.read_text(encoding="utf-8"))
+            legacy = json.loads(CACHE_PATH.read_text(encoding="utf-8"))
         except Exception:
-            return {}
-    return {}
+            legacy = {}
+        rows = []
+        for key, val in legacy.items():
+            try:
+                rows.append((key, float(val[0]), float(val[1]), now, now))
+            except Exception:
+                continue
+        conn.executemany(
+            "INSERT OR IGNORE INTO places (key, lat, lng, provider, resolved_at, checked_at) VALUES (?, ?, ?, 'legacy', ?, ?)",
+            rows,
+        )
+        conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('json_migrated', ?)", (str(len(rows)),))
+    logger.info("Migrated {} geocode entries from {} to {}", len(rows), CACHE_PATH.name, DB_PATH.name)
+
+
+def _cache_get(key: str) -> Tuple[str, Optional[Tuple[float, float]]]:
+    """Look up ``key``: returns (status, coords) with status in hit/miss/stale/absent.
+
+    ``miss`` is a negative entry still inside its TTL (or a name whose last lookup
+    hit a provider error within the error backoff); ``stale`` carries old
+    coordinates that are due for a refresh.
+    """
+    try:
+        row = _connect().execute(
+            "SELECT lat, lng, resolved_at, checked_at, error_at FROM places WHERE key = ?", (key,)
+        ).fetchone()
+    except sqlite3.Error as e:
+        logger.warning("Geocode cache read failed ({}); continuing without cache", e)
+        return "absent", None
+    if not row:
+        return "absent", None
+    lat, lng, resolved_at, checked_at, error_at = row
+    now = time.time()
+    recently_checked = (now - (checked_at or 0)) < _miss_ttl_seconds()
+    if error_at is not None and (now - error_at) < _error_ttl_seconds():
+        recently_checked = True
+    if lat is None or lng is None:
+        return ("miss" if recently_checked else "absent"), None
+    coords = (float(lat), float(lng))
+    if (now - (resolved_at or 0)) < _ttl_seconds() or recently_checked:
+        return "hit", coords
+    return "stale", coords
+
+
+def _cache_put(key: str, lat: float, lng: float, provider: str) -> None:
+    now = time.time()
+    try:
+        conn = _connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO places (key, lat, lng, provider, resolved_at, checked_at, error_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, NULL)",
+                (key, lat, lng, provider, now, now),
+            )
+    except sqlite3.Error as e:
+        logger.warning("Geocode cache write failed: {}", e)
+
+
+def _cache_put_miss(key: str) -> None:
+    # Keep existing coordinates on a failed refresh; only the attempt time moves
+    try:
+        conn = _connect()
+        with conn:
+            conn.execute(
+                "INSERT INTO places (key, lat, lng, provider, resolved_at, checked_at) VALUES (?, NULL, NULL, NULL, NULL, ?) "
+                "ON CONFLICT(key) DO UPDATE SET checked_at = excluded.checked_at, error_at = NULL",
+                (key, time.time()),
+            )
+    except sqlite3.Error as e:
+        logger.warning("Geocode cache write failed: {}", e)
+
+
+def _cache_put_error(key: str) -> None:
+    # Provider error: back off briefly; checked_at and any stale coordinates stay as they were
+    try:
+        conn = _connect()
+        with conn:
+            conn.execute(
+                "INSERT INTO places (key, lat, lng, provider, resolved_at, checked_at, error_at) "
+                "VALUES (?, NULL, NULL, NULL, NULL, 0, ?) "
+                "ON CONFLICT(key) DO UPDATE SET error_at = excluded.error_at",
+                (key, time.time()),
+            )
+    except sqlite3.Error as e:
+        logger.warning("Geocode cache write failed: {}", e)
+
+
+class _LRU:
+    """Bounded in-process memo with hit/miss counters (thread-safe)."""
 
+    def __init__(self, maxsize: int):
+        self.maxsize = max(0, maxsize)
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[str, Optional[Tuple[float, float]]]" = OrderedDict()
+        self._lock = threading.Lock()
 
-def _save_cache(cache: dict) -> None:
-    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
-    CACHE_PATH.write_text(json.dumps(cache, ensure_ascii=False, indent=2), encoding="utf-8")
+    def get(self, key: str, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: str, value: Optional[Tuple[float, float]]) -> None:
+        if not self.maxsize:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hit_rate": (self.hits / total) if total else 0.0,
+            }
+
+
+_memo: Optional[_LRU] = None
+_memo_lock = threading.Lock()
+_ABSENT = object()
+
+
+def _get_memo() -> _LRU:
+    # Created on first use so GEOCODE_LRU_SIZE from .env (loaded after import) applies
+    global _memo
+    with _memo_lock:
+        if _memo is None:
+            _memo = _LRU(int(os.getenv("GEOCODE_LRU_SIZE", "1024")))
+        return _memo
+
+
+def geocode_stats() -> Dict[str, float]:
+    """In-process LRU statistics for this run (per process)."""
+    return _get_memo().stats()
+
+
+def log_geocode_stats(label: str = "") -> None:
+    st = geocode_stats()
+    logger.info(
+        "Geocode LRU{}: hits={} misses={} hit_rate={:.0%} size={}/{}",
+        f" ({label})" if label else "", st["hits"], st["misses"], st["hit_rate"], st["size"], st["maxsize"],
+    )
+
+
+def geocode_key(name: str, country: Optional[str] = None) -> str:
+    return f"{name}|{country or ''}"
+
+
+def locate(
+    name: str, country: Optional[str] = None, table: Optional[Dict[str, Optional[Tuple[float, float]]]] = None
+) -> Optional[Tuple[float, float]]:
+    """Coordinates from a pre-resolved ``geocode_batch`` table, falling back to ``geocode_place``."""
+    if table is not None:
+        key = geocode_key(name, country)
+        if key in table:
+            return table[key]
+    return geocode_place(name, country)
 
 
 def geocode_place(name: str, country: Optional[str] = None) -> Optional[Tuple[float, float]]:
-    """Return (lat, lng) for a place, using cache -> Google -> OSM.
+    """Return (lat, lng) for a place, using memo -> gazetteer -> cache -> Google -> OSM.
 
     - Does NOT concatenate country into the address string; instead passes
       country as a filter/bias to provider-specific params to avoid queries
       like "<name> KR KR".
     """
-    key = f"{name}|{country or ''}"
-    cache = _load_cache()
-    if key in cache:
-        lat, lng = cache[key]
-        return float(lat), float(lng)
+    key = geocode_key(name, country)
+    memo = _get_memo()
+    hit = memo.get(key, _ABSENT)
+    if hit is not _ABSENT:
+        return hit
+    loc, settled = _geocode_uncached(name, country, key)
+    # negative results are memoised too: within one process an unknown name costs one lookup.
+    # Provider errors are not, so a later lookup can still succeed.
+    if settled:
+        memo.put(key, loc)
+    return loc
 
-    query = name.strip()
 
-    # Try Google Geocoding API
-    gkey = os.getenv("GOOGLE_MAPS_API_KEY")
-    if gkey:
-        try:
-            params = {"address": query, "key": gkey}
-            if country:
-                params["components"] = f"country:{country}"
-                params["region"] = country
-            r = requests.get("https://maps.googleapis.com/maps/api/geocode/json", params=params, timeout=15)
-            if r.ok:
-                data = r.json()
-                if data.get("results"):
-                    loc = data["results"][0]["geometry"]["location"]
-                    lat, lng = float(loc["lat"]), float(loc["lng"])
-                    cache[key] = [lat, lng]
-                    _save_cache(cache)
-                    return lat, lng
-                else:
-                    logger.warning("Google Geocoding returned no results for '{}' (country={})", query, country)
-            else:
-                logger.warning("Google Geocoding HTTP {code} for '{}'", r.status_code, query)
-        except Exception:
-            logger.warning("Google Geocoding error for '{}' — falling back to OSM", query)
-    else:
-        logger.info("GOOGLE_MAPS_API_KEY not set. Using OSM Nominatim for '{}'", query)
+def _geocode_uncached(name: str, country: Optional[str], key: str) -> Tuple[Optional[Tuple[float, float]], bool]:
+    """(coords, settled); ``settled`` is False when a provider error left the answer open."""
+    # Local gazetteer first: common names resolve with no DB or network round trip
+    loc = gazetteer_lookup(name, country)
+    if loc:
+        return loc, True
+    status, cached = _cache_get(key)
+    if status in ("hit", "miss"):
+        return cached, True
 
-    # Fallback to OSM Nominatim (be polite: include email if provided)
-    headers = {"User-Agent": "agentic-market-entry/0.1"}
-    email = os.getenv("OSM_NOMINATIM_EMAIL")
-    try:
-        params = {"q": query, "format": "json", "limit": 1, **({"email": email} if email else {})}
-        if country:
-            params["countrycodes"] = country.lower()
-        r = requests.get("https://nominatim.openstreetmap.org/search", params=params, headers=headers, timeout=15)
-        if r.ok and r.json():
-            item = r.json()[0]
-            lat, lng = float(item["lat"]), float(item["lon"])
-            cache[key] = [lat, lng]
-            _save_cache(cache)
-            return lat, lng
-    except Exception:
-        logger.warning("OSM Nominatim geocoding failed for '{}'", query)
-
-    return None
+    loc, provider = _fetch(name, country)
+    return _store_fetched(key, name, loc, provider, cached)
+
+
+def _store_fetched(
+    key: str,
+    name: str,
+    loc: Optional[Tuple[float, float]],
+    provider: Optional[str],
+    fallback: Optional[Tuple[float, float]],
+) -> Tuple[Optional[Tuple[float, float]], bool]:
+    # Cache a provider answer; on provider errors only the short error backoff is recorded
+    if loc:
+        _cache_put(key, loc[0], loc[1], provider)
+        return loc, True
+    if provider == PROVIDER_ERROR:
+        _cache_put_error(key)
+        if fallback:
+            logger.info("Geocode refresh failed for '{}'; keeping stale coordinates", name)
+        return fallback, False
+    _cache_put_miss(key)
+    if fallback:
+        logger.info("Geocode refresh found no match for '{}'; keeping stale coordinates", name)
+    return fallback, True
+
+
+def _fetch(name: str, country: Optional[str]) -> Tuple[Optional[Tuple[float, float]], Optional[str]]:
+    """Query providers in order (Google, then OSM Nominatim); returns ((lat, lng), provider),
+    (None, None) for "no match" or (None, PROVIDER_ERROR) when a provider failed."""
+    return get_client().fetch(name, country)
+
+
+def geocode_batch(pairs: Iterable[Tuple[str, Optional[str]]]) -> Dict[str, Optional[Tuple[float, float]]]:
+    """Resolve many (name, country) pairs once each; returns {geocode_key: (lat, lng) | None}.
+
+    Memo, gazetteer and disk-cache hits are answered directly; the remaining names go to
+    the providers concurrently through ``GeocodeClient.fetch_many``.
+    """
+    memo = _get_memo()
+    resolved: Dict[str, Optional[Tuple[float, float]]] = {}
+    todo: Dict[Tuple[str, Optional[str]], Optional[Tuple[float, float]]] = {}
+    for name, country in pairs:
+        key = geocode_key(name, country)
+        if not name or key in resolved or (name, country) in todo:
+            continue
+        hit = memo.get(key, _ABSENT)
+        if hit is not _ABSENT:
+            resolved[key] = hit
+            continue
+        local = gazetteer_lookup(name, country)
+        if local:
+            resolved[key] = local
+            memo.put(key, local)
+            continue
+        status, cached = _cache_get(key)
+        if status in ("hit", "miss"):
+            resolved[key] = cached
+            memo.put(key, cached)
+        else:
+            todo[(name, country)] = cached  # stale coordinates (or None) kept as fallback
+
+    if todo:
+        fetched = get_client().fetch_many(list(todo))
+        for (name, country), (loc, provider) in fetched.items():
+            key = geocode_key(name, country)
+            loc, settled = _store_fetched(key, name, loc, provider, todo[(name, country)])
+            resolved[key] = loc
+            if settled:
+                memo.put(key, loc)
+    return resolved
@@ -0,0 +1,292 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from loguru import logger
+
+
+GOOGLE_GEOCODE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+USER_AGENT = "agentic-market-entry/0.1"
+# Rate limit state shared by every process (case workers of `--workers N`); same file as the geocode cache
+RATE_DB_PATH = Path(__file__).resolve().parents[2] / "artifacts" / "cache" / "geocode_cache.sqlite"
+
+Coords = Tuple[float, float]
+
+# Provider slot of ``fetch`` results when no coordinates were found because a
+# provider failed (HTTP error, quota, network) rather than answering "no match"
+PROVIDER_ERROR = "error"
+
+
+class ProviderError(Exception):
+    """A provider did not give a usable answer (as opposed to a definitive empty result)."""
+
+
+class RequestsTransport:
+    """Default transport: one keep-alive ``requests.Session`` with a sized connection pool.
+
+    Any object with the same ``get(url, params, headers, timeout) -> (status, json)``
+    method can be passed to ``GeocodeClient`` instead (e.g. pointing at a local fake server);
+    ``StaticMapClient`` uses ``get_raw(...) -> (status, content_type, bytes)``.
+    """
+
+    def __init__(self, pool_size: int = 16):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, url: str, params: Dict[str, Any], headers: Dict[str, str], timeout: float) -> Tuple[int, Any]:
+        r = self.session.get(url, params=params, headers=headers, timeout=timeout)
+        try:
+            data = r.json()
+        except ValueError:
+            data = None
+        return r.status_code, data
+
+    def get_raw(self, url: str, params: Any, headers: Dict[str, str], timeout: float) -> Tuple[int, str, bytes]:
+        r = self.session.get(url, params=params, headers=headers, timeout=timeout)
+        return r.status_code, r.headers.get("Content-Type", ""), r.content
+
+
+class TokenBucket:
+    """Token bucket usable from threads (``acquire``) and coroutines (``acquire_async``).
+
+    Tokens are reserved under a lock and the caller sleeps outside it, so
+    concurrent callers queue up at ``rate`` per second after an initial burst.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = max(rate, 1e-6)
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self) -> None:
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        wait = self._reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+
+class SharedTokenBucket(TokenBucket):
+    """``TokenBucket`` whose state is a row in a SQLite file, so all processes share one budget.
+
+    Each reservation is a ``BEGIN IMMEDIATE`` transaction on the ``rate_limits``
+    row for ``name``, which stores the theoretical arrival time of the next
+    request (GCRA, wall clock). If the database cannot be used the bucket falls
+    back to the in-process limiter.
+    """
+
+    def __init__(self, name: str, rate: float, burst: int = 1, path: Optional[Path] = None):
+        super().__init__(rate, burst)
+        self.name = name
+        self.path = Path(path) if path else RATE_DB_PATH
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS rate_limits (name TEXT PRIMARY KEY, next_at REAL NOT NULL)")
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def _reserve(self) -> float:
+        interval = 1.0 / self.rate
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    row = conn.execute("SELECT next_at FROM rate_limits WHERE name = ?", (self.name,)).fetchone()
+                    now = time.time()
+                    tat = max(row[0] if row else 0.0, now)
+                    start = max(now, tat - (self.capacity - 1) * interval)
+                    conn.execute(
+                        "INSERT OR REPLACE INTO rate_limits (name, next_at) VALUES (?, ?)", (self.name, tat + interval)
+                    )
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+                return start - now
+            except sqlite3.Error as e:
+                logger.warning("Shared rate limit for {} unavailable ({}); limiting per process", self.name, e)
+        return super()._reserve()
+
+    async def acquire_async(self) -> None:
+        # The reservation may wait on another process's write lock: keep it off the event loop
+        wait = await asyncio.to_thread(self._reserve)
+        if wait:
+            await asyncio.sleep(wait)
+
+
+class GeocodeClient:
+    """Network side of geocoding: Google first, OSM Nominatim as fallback.
+
+    Providers are rate limited per provider (Google ``GOOGLE_GEOCODE_QPS``,
+    Nominatim ``NOMINATIM_QPS`` = 1/s per its usage policy) across all processes
+    sharing ``rate_db`` (see ``SharedTokenBucket``), and the batch API runs at
+    most ``GEOCODE_CONCURRENCY`` requests at once. Caching lives in
+    ``geocode.py``; this class only talks to providers.
+    """
+
+    def __init__(
+        self,
+        transport=None,
+        concurrency: Optional[int] = None,
+        google_qps: Optional[float] = None,
+        nominatim_qps: Optional[float] = None,
+        google_url: Optional[str] = None,
+        nominatim_url: Optional[str] = None,
+        timeout: float = 15,
+        rate_db: Optional[Path] = None,
+    ):
+        self.concurrency = concurrency or int(os.getenv("GEOCODE_CONCURRENCY", "8"))
+        self.transport = transport or RequestsTransport(pool_size=max(self.concurrency, 4))
+        self.google_url = google_url or os.getenv("GOOGLE_GEOCODE_URL", GOOGLE_GEOCODE_URL)
+        self.nominatim_url = nominatim_url or os.getenv("NOMINATIM_URL", NOMINATIM_URL)
+        self.timeout = timeout
+        self.limits = {
+            "google": SharedTokenBucket(
+                "google", google_qps or float(os.getenv("GOOGLE_GEOCODE_QPS", "10")), burst=5, path=rate_db
+            ),
+            "nominatim": SharedTokenBucket(
+                "nominatim", nominatim_qps or float(os.getenv("NOMINATIM_QPS", "1")), burst=1, path=rate_db
+            ),
+        }
+
+    def _requests(self, name: str, country: Optional[str]) -> List[Tuple[str, str, Dict[str, Any], Dict[str, str]]]:
+        # Country is passed as a provider filter, never appended to the query ("<name> KR KR")
+        query = name.strip()
+        plan = []
+        gkey = os.getenv("GOOGLE_MAPS_API_KEY")
+        if gkey:
+            params = {"address": query, "key": gkey}
+            if country:
+                params["components"] = f"country:{country}"
+                params["region"] = country
+            plan.append(("google", self.google_url, params, {}))
+        else:
+            logger.info("GOOGLE_MAPS_API_KEY not set. Using OSM Nominatim for '{}'", query)
+        email = os.getenv("OSM_NOMINATIM_EMAIL")
+        params = {"q": query, "format": "json", "limit": 1, **({"email": email} if email else {})}
+        if country:
+            params["countrycodes"] = country.lower()
+        plan.append(("nominatim", self.nominatim_url, params, {"User-Agent": USER_AGENT}))
+        return plan
+
+    @staticmethod
+    def _parse(provider: str, status: int, data: Any, query: str, country: Optional[str]) -> Optional[Coords]:
+        """Coordinates, or None for a definitive "no match"; raises ProviderError otherwise."""
+        if status != 200:
+            raise ProviderError(f"HTTP {status}")
+        if provider == "google":
+            gstatus = data.get("status") if isinstance(data, dict) else None
+            results = data.get("results") if isinstance(data, dict) else None
+            if results:
+                loc = results[0]["geometry"]["location"]
+                return float(loc["lat"]), float(loc["lng"])
+            if gstatus == "ZERO_RESULTS":
+                logger.warning("Google Geocoding returned no results for '{}' (country={})", query, country)
+                return None
+            # OVER_QUERY_LIMIT, REQUEST_DENIED, UNKNOWN_ERROR, ... say nothing about the place
+            raise ProviderError(f"status {gstatus}")
+        if not isinstance(data, list):
+            raise ProviderError("unexpected response body")
+        if data:
+            return float(data[0]["lat"]), float(data[0]["lon"])
+        return None
+
+    def fetch(self, name: str, country: Optional[str] = None) -> Tuple[Optional[Coords], Optional[str]]:
+        """Blocking lookup; returns ((lat, lng), provider), (None, None) when every provider
+        answered "no match", or (None, PROVIDER_ERROR) when at least one of them failed."""
+        failed = False
+        for provider, url, params, headers in self._requests(name, country):
+            try:
+                self.limits[provider].acquire()
+                status, data = self.transport.get(url, params, headers, self.timeout)
+                loc = self._parse(provider, status, data, name.strip(), country)
+                if loc:
+                    return loc, provider
+            except Exception as e:
+                failed = True
+                logger.warning("{} geocoding failed for '{}': {}", provider, name, e)
+        return None, (PROVIDER_ERROR if failed else None)
+
+    async def fetch_async(self, name: str, country: Optional[str], sem: asyncio.Semaphore) -> Tuple[Optional[Coords], Optional[str]]:
+        aget = getattr(self.transport, "aget", None)
+        failed = False
+        for provider, url, params, headers in self._requests(name, country):
+            try:
+                async with sem:
+                    await self.limits[provider].acquire_async()
+                    if aget is not None:
+                        status, data = await aget(url, params, headers, self.timeout)
+                    else:
+                        status, data = await asyncio.to_thread(self.transport.get, url, params, headers, self.timeout)
+                loc = self._parse(provider, status, data, name.strip(), country)
+                if loc:
+                    return loc, provider
+            except Exception as e:
+                failed = True
+                logger.warning("{} geocoding failed for '{}': {}", provider, name, e)
+        return None, (PROVIDER_ERROR if failed else None)
+
+    async def fetch_many_async(
+        self, pairs: Iterable[Tuple[str, Optional[str]]]
+    ) -> Dict[Tuple[str, Optional[str]], Tuple[Optional[Coords], Optional[str]]]:
+        unique = list(dict.fromkeys(pairs))
+        sem = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(*(self.fetch_async(n, c, sem) for n, c in unique))
+        return dict(zip(unique, results))
+
+    def fetch_many(
+        self, pairs: Iterable[Tuple[str, Optional[str]]]
+    ) -> Dict[Tuple[str, Optional[str]], Tuple[Optional[Coords], Optional[str]]]:
+        """Resolve many pairs concurrently (bounded, rate limited) from synchronous code."""
+        return asyncio.run(self.fetch_many_async(pairs))
+
+
+_client: Optional[GeocodeClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> GeocodeClient:
+    """Process-wide client, so every lookup shares one connection pool and rate limiter."""
+    global _client
+    with _client_lock:
+        if _client is None or getattr(_client, "_pid", None) != os.getpid():
+            _client = GeocodeClient()
+            _client._pid = os.getpid()
+        return _client
+
+
+def set_client(client: Optional[GeocodeClient]) -> None:
+    """Swap the process-wide client (e.g. one built on a fake transport)."""
+    global _client
+    with _client_lock:
+        _client = client
+        if client is not None:
+            client._pid = os.getpid()
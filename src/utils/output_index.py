@@ -1,35 +1,57 @@
 import os
 import json
 from pathlib import Path
+from typing import List, Optional
 
 
-def build_outputs_index(out_dir: str) -> None:
+def _row(root: Path, p: Path, data: dict, card) -> dict:
+    return {
+        "name": p.name,
+        "decision": data.get("decision"),
+        "final": data.get("final"),
+        "coverage": data.get("coverage"),
+        "tbd_ratio": data.get("tbd_ratio"),
+        "risk_badge": data.get("risk_badge"),
+        "gtm": data.get("gtm_selected"),
+        "card": str((p / data.get("card", "")).relative_to(root)) if data.get("card") else (str(card.relative_to(root)) if card else None),
+        "html": str((p / f"strategy_card_{p.name}.html").relative_to(root)) if (p / f"strategy_card_{p.name}.html").exists() else None,
+    }
+
+
+def build_outputs_index(out_dir: str, summaries: Optional[List[dict]] = None) -> None:
+    """Write ``README.md`` index for the case folders under ``out_dir``.
+
+    Every ``*_*`` case folder on disk is listed (from its summary.json, or as a
+    plain card link if it has none). ``summaries`` (summary.json-shaped dicts from
+    the in-memory run) override the rows of the cases just run, so those do not
+    depend on re-reading files written moments ago.
+    """
     root = Path(out_dir)
+    fresh = {f"{d.get('company')}_{d.get('country')}": d for d in (summaries or [])}
     rows = []
     links = []
+    seen = set()
     for p in sorted(root.glob("*_*")):
         if not p.is_dir():
             continue
-        summary = p / "summary.json"
+        seen.add(p.name)
         card = next(p.glob("strategy_card_*.md"), None)
+        if p.name in fresh:
+            rows.append(_row(root, p, fresh[p.name], card))
+            continue
+        summary = p / "summary.json"
         if summary.exists():
             try:
                 data = json.loads(summary.read_text(encoding="utf-8"))
-                rows.append({
-                    "name": p.name,
-                    "decision": data.get("decision"),
-                    "final": data.get("final"),
-                    "coverage": data.get("coverage"),
-                    "tbd_ratio": data.get("tbd_ratio"),
-                    "risk_badge": data.get("risk_badge"),
-                    "gtm": data.get("gtm_selected"),
-                    "card": str((p / data.get("card", "")).relative_to(root)) if data.get("card") else (str(card.relative_to(root)) if card else None),
-                    "html": str((p / f"strategy_card_{p.name}.html").relative_to(root)) if (p / f"strategy_card_{p.name}.html").exists() else None,
-                })
+                rows.append(_row(root, p, data, card))
             except Exception:
                 pass
         elif card:
             links.append((p.name, str(card.relative_to(root))))
+    # Cases of this run whose folder is not on disk (yet) still get their row
+    for name in sorted(set(fresh) - seen):
+        rows.append(_row(root, root / name, fresh[name], None))
+    rows.sort(key=lambda r: r["name"])
 
     lines = ["# Outputs Index", "", "자동 생성된 전략 카드 요약", ""]
     if rows:
@@ -0,0 +1,162 @@
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlencode
+from loguru import logger
+from .disk_cache import trim_cache_dir
+from .geocode_client import RequestsTransport
+
+
+GOOGLE_STATIC_MAPS_URL = "https://maps.googleapis.com/maps/api/staticmap"
+CACHE_DIR = Path(__file__).resolve().parents[2] / "artifacts" / "cache" / "static_maps"
+
+Params = List[Tuple[str, str]]
+
+
+class StaticMapClient:
+    """Google Static Maps fetcher with a pooled session and an on-disk response cache.
+
+    Responses are stored under ``cache_dir`` keyed by the canonical (sorted)
+    request parameters, never including the API key. Concurrent identical
+    requests are coalesced: threads of one process wait on the first caller,
+    and other processes wait on a ``.lock`` file beside the cache entry.
+    ``base_url`` (or ``GOOGLE_STATIC_MAPS_URL``) can point at a local stub server.
+    """
+
+    def __init__(
+        self,
+        transport=None,
+        base_url: Optional[str] = None,
+        cache_dir: Optional[Path] = None,
+        timeout: float = 15,
+        max_cache_mb: Optional[float] = None,
+    ):
+        self.transport = transport or RequestsTransport(pool_size=8)
+        self.base_url = base_url or os.getenv("GOOGLE_STATIC_MAPS_URL", GOOGLE_STATIC_MAPS_URL)
+        self.cache_dir = Path(cache_dir) if cache_dir else CACHE_DIR
+        self.timeout = timeout
+        self.max_bytes = int((max_cache_mb or float(os.getenv("STATIC_MAP_CACHE_MB", "64"))) * 1024 * 1024)
+        self.requests_made = 0
+        self._inflight: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def canonical_params(params: Iterable[Tuple[str, Any]]) -> Params:
+        # Order-independent and key-free, so the same map always hits the same entry
+        return sorted((str(k), str(v)) for k, v in params if k != "key")
+
+    def cache_key(self, params: Iterable[Tuple[str, Any]]) -> str:
+        raw = self.base_url + "?" + urlencode(self.canonical_params(params))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+    def fetch(self, params: Iterable[Tuple[str, Any]]) -> Optional[str]:
+        """Path of the cached image for ``params`` (fetched on a miss), or None on failure."""
+        params = self.canonical_params(params)
+        key = self.cache_key(params)
+        path = self.cache_dir / f"{key}.png"
+        if self._hit(path):
+            return str(path)
+        with self._lock:
+            event = self._inflight.get(key)
+            leader = event is None
+            if leader:
+                event = self._inflight[key] = threading.Event()
+        if not leader:
+            event.wait(self.timeout * 2)
+            return str(path) if path.exists() else None
+        try:
+            return self._fetch_exclusive(params, path)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+    @staticmethod
+    def _hit(path: Path) -> bool:
+        if not path.exists():
+            return False
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return True
+
+    def _fetch_exclusive(self, params: Params, path: Path) -> Optional[str]:
+        # Cross-process coalescing: one process downloads, the others wait for the file
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        lock = path.with_suffix(".lock")
+        owned = False
+        deadline = time.monotonic() + self.timeout * 2
+        while not owned:
+            try:
+                os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                owned = True
+            except FileExistsError:
+                if self._hit(path):
+                    return str(path)
+                try:
+                    if time.time() - lock.stat().st_mtime > self.timeout * 2:
+                        lock.unlink()  # left behind by a crashed process
+                        continue
+                except OSError:
+                    continue
+                if time.monotonic() > deadline:
+                    break
+                time.sleep(0.05)
+        try:
+            if self._hit(path):
+                return str(path)
+            return self._download(params, path)
+        finally:
+            if owned:
+                try:
+                    lock.unlink()
+                except OSError:
+                    pass
+
+    def _download(self, params: Params, path: Path) -> Optional[str]:
+        api_key = os.getenv("GOOGLE_MAPS_API_KEY")
+        query = params + ([("key", api_key)] if api_key else [])
+        try:
+            self.requests_made += 1
+            status, content_type, content = self.transport.get_raw(self.base_url, query, {}, self.timeout)
+        except Exception as e:
+            logger.warning("Google Static Maps error: {} ({})", str(e), dict(params).get("center"))
+            return None
+        if status != 200 or not content_type.startswith("image"):
+            logger.warning("Google Static Maps failed (status {}) for {}", status, dict(params).get("center"))
+            return None
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            tmp.write_bytes(content)
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+        trim_cache_dir(self.cache_dir, self.max_bytes, keep=path)
+        return str(path)
+
+
+_client: Optional[StaticMapClient] = None
+_client_lock = threading.Lock()
+
+
+def get_static_map_client() -> StaticMapClient:
+    """Process-wide client sharing one connection pool and in-flight table."""
+    global _client
+    with _client_lock:
+        if _client is None or getattr(_client, "_pid", None) != os.getpid():
+            _client = StaticMapClient()
+            _client._pid = os.getpid()
+        return _client
+
+
+def set_static_map_client(client: Optional[StaticMapClient]) -> None:
+    """Swap the process-wide client (e.g. one pointed at a local stub server)."""
+    global _client
+    with _client_lock:
+        _client = client
+        if client is not None:
+            client._pid = os.getpid()
@@ -0,0 +1,46 @@
+import os
+import threading
+from pathlib import Path
+from typing import Any, Optional
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+
+# Report cards (HTML/Markdown) and LLM narrative prompts, editable without touching code
+TEMPLATE_DIR = Path(__file__).resolve().parents[1] / "templates"
+BYTECODE_DIR = Path(__file__).resolve().parents[2] / "artifacts" / "cache" / "jinja"
+
+_env: Optional[Environment] = None
+_lock = threading.Lock()
+
+
+def _use_bytecode_cache() -> bool:
+    return str(os.getenv('JINJA_BYTECODE_CACHE', '0')).lower() in ('1', 'true', 'yes')
+
+
+def get_environment() -> Environment:
+    """Process-wide Jinja environment; each template is parsed and compiled once.
+
+    Same rendering options as ``jinja2.Template(...)`` (no autoescape, trailing
+    newline dropped), so output matches the former inline templates.
+    JINJA_BYTECODE_CACHE=1 also persists compiled bytecode under ``artifacts/cache/jinja``
+    so new processes (case/render workers) skip compilation too.
+    """
+    global _env
+    if _env is not None:
+        return _env
+    with _lock:
+        if _env is None:
+            bytecode_cache = None
+            if _use_bytecode_cache():
+                BYTECODE_DIR.mkdir(parents=True, exist_ok=True)
+                bytecode_cache = FileSystemBytecodeCache(str(BYTECODE_DIR))
+            _env = Environment(
+                loader=FileSystemLoader(str(TEMPLATE_DIR)),
+                bytecode_cache=bytecode_cache,
+                auto_reload=False,
+            )
+        return _env
+
+
+def render_template(name: str, **ctx: Any) -> str:
+    return get_environment().get_template(name).render(**ctx)
@@ -0,0 +1,136 @@
+import hashlib
+import math
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Tuple
+import numpy as np
+import matplotlib.image as mpimg
+from matplotlib.figure import Figure
+from loguru import logger
+from ..utils.disk_cache import trim_cache_dir
+from ..utils.static_map_client import get_static_map_client
+
+
+BASEMAP_DIR = Path(__file__).resolve().parents[2] / "artifacts" / "cache" / "basemaps"
+DEFAULT_SIZE = (800, 400)
+DEFAULT_CENTERS = {"KR": (37.5665, 126.9780), "JP": (35.6762, 139.6503), "US": (40.0, -95.0)}
+# Bump when the offline drawing changes so stale cache entries are not reused
+OFFLINE_STYLE = 1
+
+Center = Tuple[float, float]
+Extent = Tuple[float, float, float, float]
+
+
+def default_zoom(country: str) -> int:
+    return 7 if country == "KR" else (5 if country in ("JP", "US") else 4)
+
+
+def latlng_to_world_xy(lat: float, lng: float, zoom: int) -> Tuple[float, float]:
+    scale = 256 * (2 ** zoom)
+    x = (lng + 180.0) / 360.0 * scale
+    siny = math.sin(math.radians(lat))
+    y = (0.5 - math.log((1 + siny) / (1 - siny)) / (4 * math.pi)) * scale
+    return x, y
+
+
+def world_xy_to_latlng(x: float, y: float, zoom: int) -> Tuple[float, float]:
+    scale = 256 * (2 ** zoom)
+    lng = x / scale * 360.0 - 180.0
+    n = math.pi * (1 - 2 * (y / scale))
+    lat = math.degrees(math.atan(math.sinh(n)))
+    return lat, lng
+
+
+def snap_center(lat: float, lng: float, zoom: int) -> Center:
+    """Round a marker centroid to a quarter-tile grid so cases of one country share a basemap.
+
+    A quarter tile is 64 px at ``zoom``, i.e. at most a 32 px shift inside an 800x400 frame.
+    """
+    step = 90.0 / (2 ** zoom)
+    return round(round(lat / step) * step, 4), round(round(lng / step) * step, 4)
+
+
+def map_extent(center: Center, zoom: int, size: Tuple[int, int] = DEFAULT_SIZE) -> Extent:
+    """(lng_left, lng_right, lat_bottom, lat_top) covered by a WebMercator image of ``size``."""
+    w, h = size
+    cx, cy = latlng_to_world_xy(center[0], center[1], zoom)
+    lat_top, lng_left = world_xy_to_latlng(cx - w / 2, cy - h / 2, zoom)
+    lat_bot, lng_right = world_xy_to_latlng(cx + w / 2, cy + h / 2, zoom)
+    return lng_left, lng_right, lat_bot, lat_top
+
+
+def _cache_key(provider: str, center: Center, zoom: int, size: Tuple[int, int]) -> str:
+    raw = f"{provider}|{center[0]:.4f},{center[1]:.4f}|z{zoom}|{size[0]}x{size[1]}|nomarkers"
+    if provider == "offline":
+        raw += f"|style{OFFLINE_STYLE}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+
+
+def _render_offline(center: Center, zoom: int, size: Tuple[int, int], out_path: Path) -> None:
+    # Plain background with a lat/lng graticule; no geodata needed
+    w, h = size
+    lng_left, lng_right, lat_bot, lat_top = map_extent(center, zoom, size)
+    fig = Figure(figsize=(w / 100, h / 100), dpi=100)
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.set_facecolor("#eef2ff")
+    ax.set_xlim(lng_left, lng_right); ax.set_ylim(lat_bot, lat_top)
+    step = 1.0 if zoom >= 7 else (5.0 if zoom >= 5 else 10.0)
+    for x in np.arange(math.ceil(lng_left / step) * step, lng_right, step):
+        ax.axvline(x, color="#c7d2fe", linewidth=0.6)
+    for y in np.arange(math.ceil(lat_bot / step) * step, lat_top, step):
+        ax.axhline(y, color="#c7d2fe", linewidth=0.6)
+    ax.set_xticks([]); ax.set_yticks([])
+    for spine in ax.spines.values():
+        spine.set_visible(False)
+    fig.savefig(out_path, dpi=100, format="png")
+
+
+def _max_bytes() -> int:
+    return int(float(os.getenv("BASEMAP_CACHE_MB", "64")) * 1024 * 1024)
+
+
+def get_basemap(provider: str, center: Center, zoom: int, size: Tuple[int, int] = DEFAULT_SIZE) -> Optional[str]:
+    """Path of a cached marker-free basemap PNG, fetched or drawn on first use.
+
+    ``provider`` is ``"google"`` (Static Maps) or ``"offline"``. Entries are
+    shared across cases, runs and worker processes under ``artifacts/cache/basemaps``.
+    """
+    if provider == "google":
+        # Static Maps responses are cached (and coalesced) by the client itself
+        return get_static_map_client().fetch([
+            ("center", f"{center[0]},{center[1]}"),
+            ("zoom", zoom),
+            ("size", f"{size[0]}x{size[1]}"),
+            ("maptype", "roadmap"),
+        ])
+    path = BASEMAP_DIR / f"{provider}_{_cache_key(provider, center, zoom, size)}.png"
+    if path.exists():
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return str(path)
+    BASEMAP_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        _render_offline(center, zoom, size, tmp)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    logger.debug("Cached {} basemap {} (center {}, zoom {})", provider, path.name, center, zoom)
+    trim_cache_dir(BASEMAP_DIR, _max_bytes(), keep=path)
+    return str(path)
+
+
+@lru_cache(maxsize=16)
+def _read(path: str, mtime: float) -> np.ndarray:
+    img = mpimg.imread(path)
+    img.setflags(write=False)
+    return img
+
+
+def load_basemap(path: str) -> np.ndarray:
+    """Decoded basemap pixels, memoised per process (read-only array shared between cases)."""
+    return _read(path, os.path.getmtime(path))
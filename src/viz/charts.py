@@ -2,8 +2,12 @@ import os
 import re
 import warnings
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from matplotlib import patches
+from . import fonts, formats
 from .fonts import ensure_kr_font
+from .formats import artifact_format, artifact_path, save_figure
+from .render_cache import mark_rendered, render_digest, up_to_date
 
 # Ensure ASCII minus; silence glyph warnings
 plt.rcParams['axes.unicode_minus'] = False
@@ -13,6 +17,10 @@ warnings.filterwarnings(
     category=UserWarning,
 )
 
+# Files whose changes invalidate previously rendered charts
+_SOURCES = (__file__, fonts.__file__, formats.__file__)
+_SUBPLOT_PARAMS = ("left", "right", "bottom", "top", "wspace", "hspace")
+
 
 def _parse_numeric(value):
     if value is None:
@@ -35,58 +43,142 @@ def _parse_numeric(value):
         return None
 
 
+def market_summary_path(company, country, *_args, **_kwargs):
+    return artifact_path(f"outputs/{company}_{country}/01_market_summary_{company}_{country}.png", "diagram")
+
+
+def customs_flow_path(company, country, *_args, **_kwargs):
+    return artifact_path(f"outputs/{company}_{country}/02_customs_flow_{company}_{country}.png", "diagram")
+
+
+def _market_summary_digest(company, country, metrics):
+    inputs = {"company": company, "country": country, "metrics": metrics, "format": artifact_format("diagram")}
+    return render_digest("market_summary", inputs, _SOURCES)
+
+
+class _MarketSummaryFrame:
+    """One market-summary figure whose artists are updated in place from case to case.
+
+    Bars are resized rather than re-created when the metric count is unchanged,
+    and ``tight_layout`` only re-runs when tick labels or value magnitude change.
+    """
+
+    def __init__(self):
+        ensure_kr_font()
+        self.fig = Figure(figsize=(7, 3))
+        self.title = self.fig.suptitle("", fontsize=11, y=0.98)
+
+        gs = self.fig.add_gridspec(1, 2, width_ratios=[1.2, 1.8])
+        self.ax_bar = self.fig.add_subplot(gs[0, 0])
+        self.ax_txt = self.fig.add_subplot(gs[0, 1])
+
+        self.ax_txt.axis("off")
+        self.ax_txt.text(0, 0.95, "Metrics", fontsize=10, fontweight="bold", va="top")
+        self.txt = self.ax_txt.text(0, 0.88, "", fontsize=9, va="top")
+        self.bars = None
+        self.layout_key = None
+
+    def _draw_bars(self, labels, vals):
+        ax_bar = self.ax_bar
+        if vals and self.bars is not None and len(self.bars) == len(vals):
+            for rect, v in zip(self.bars, vals):
+                rect.set_width(v)
+        else:
+            ax_bar.cla()
+            self.bars = None
+            if vals:
+                self.bars = ax_bar.barh(range(len(vals)), vals, color="#5B8FF9")
+                ax_bar.set_yticks(range(len(vals)))
+                ax_bar.invert_yaxis()
+                ax_bar.set_xlabel("value (normalized)", fontsize=8)
+            else:
+                ax_bar.text(0.5, 0.5, "(no numeric metrics)", ha="center", va="center", fontsize=9)
+                ax_bar.set_xticks([])
+                ax_bar.set_yticks([])
+            ax_bar.grid(axis="x", alpha=0.2, linestyle=":")
+        if vals:
+            ax_bar.set_yticklabels(labels, fontsize=9)
+            xmax = max(vals)
+            ax_bar.set_xlim(0, xmax * 1.15)
+
+    def _xtick_labels(self):
+        # Tick text decides the layout margins; formatting it needs no draw
+        axis = self.ax_bar.xaxis
+        locs = [v for v in axis.get_major_locator()() if 0 <= v <= self.ax_bar.get_xlim()[1]]
+        fmt = axis.get_major_formatter()
+        return tuple(fmt.format_ticks(locs)) + (fmt.get_offset(),)
+
+    def render(self, company, country, metrics, path):
+        self.title.set_text(f"Market Summary | {company} - {country}")
+
+        keys = list(metrics.keys()) if isinstance(metrics, dict) else []
+        vals = []
+        labels = []
+        for k in keys:
+            v = _parse_numeric(metrics.get(k))
+            if v is not None:
+                labels.append(k)
+                vals.append(v)
+        self._draw_bars(labels, vals)
+
+        lines = [f"• {k}: {metrics.get(k)}" for k in keys]
+        txt = "\n".join(lines[:8])
+        self.txt.set_text(txt or "(no metrics)")
+
+        layout_key = (tuple(labels), self._xtick_labels() if vals else None)
+        if layout_key != self.layout_key:
+            # Start from the default margins so the result matches a freshly built figure
+            self.fig.subplots_adjust(**{k: plt.rcParams[f"figure.subplot.{k}"] for k in _SUBPLOT_PARAMS})
+            self.fig.tight_layout(rect=[0, 0, 1, 0.94])
+            self.layout_key = layout_key
+        save_figure(self.fig, path, "diagram", dpi=150)
+        return path
+
+
 def render_market_summary_png(company, country, metrics):
     os.makedirs(f"outputs/{company}_{country}", exist_ok=True)
-    path = f"outputs/{company}_{country}/01_market_summary_{company}_{country}.png"
+    path = market_summary_path(company, country)
+    digest = _market_summary_digest(company, country, metrics)
+    if up_to_date(path, digest):
+        return path
 
-    ensure_kr_font()
-    fig = plt.figure(figsize=(7, 3))
-    fig.suptitle(f"Market Summary | {company} - {country}", fontsize=11, y=0.98)
-
-    gs = fig.add_gridspec(1, 2, width_ratios=[1.2, 1.8])
-    ax_bar = fig.add_subplot(gs[0, 0])
-    ax_txt = fig.add_subplot(gs[0, 1])
-
-    keys = list(metrics.keys()) if isinstance(metrics, dict) else []
-    vals = []
-    labels = []
-    for k in keys:
-        v = _parse_numeric(metrics.get(k))
-        if v is not None:
-            labels.append(k)
-            vals.append(v)
-    if vals:
-        ax_bar.barh(range(len(vals)), vals, color="#5B8FF9")
-        ax_bar.set_yticks(range(len(vals)))
-        ax_bar.set_yticklabels(labels, fontsize=9)
-        ax_bar.invert_yaxis()
-        ax_bar.set_xlabel("value (normalized)", fontsize=8)
-        xmax = max(vals)
-        ax_bar.set_xlim(0, xmax * 1.15)
-    else:
-        ax_bar.text(0.5, 0.5, "(no numeric metrics)", ha="center", va="center", fontsize=9)
-        ax_bar.set_xticks([])
-        ax_bar.set_yticks([])
-    ax_bar.grid(axis="x", alpha=0.2, linestyle=":")
-
-    ax_txt.axis("off")
-    lines = [f"• {k}: {metrics.get(k)}" for k in keys]
-    txt = "\n".join(lines[:8])
-    ax_txt.text(0, 0.95, "Metrics", fontsize=10, fontweight="bold", va="top")
-    ax_txt.text(0, 0.88, txt or "(no metrics)", fontsize=9, va="top")
-
-    fig.tight_layout(rect=[0, 0, 1, 0.94])
-    fig.savefig(path, dpi=150)
-    plt.close(fig)
+    _MarketSummaryFrame().render(company, country, metrics, path)
+    mark_rendered(path, digest)
     return path
 
 
+def render_market_summaries(cases):
+    """Render 01_market_summary for many ``(company, country, metrics)`` cases in one figure session.
+
+    Cases whose render manifest is current are skipped; every written PNG is
+    recorded, so the per-case ``render_market_summary_png`` calls that follow
+    return immediately. Returns the output paths in input order.
+    """
+    frame = None
+    paths = []
+    for company, country, metrics in cases:
+        os.makedirs(f"outputs/{company}_{country}", exist_ok=True)
+        path = market_summary_path(company, country)
+        digest = _market_summary_digest(company, country, metrics)
+        if not up_to_date(path, digest):
+            frame = frame or _MarketSummaryFrame()
+            frame.render(company, country, metrics, path)
+            mark_rendered(path, digest)
+        paths.append(path)
+    return paths
+
+
 def render_customs_flow_png(company, country):
     os.makedirs(f"outputs/{company}_{country}", exist_ok=True)
-    path = f"outputs/{company}_{country}/02_customs_flow_{company}_{country}.png"
+    path = customs_flow_path(company, country)
+    # Depends only on (company, country)
+    digest = render_digest("customs_flow", {"company": company, "country": country, "format": artifact_format("diagram")}, _SOURCES)
+    if up_to_date(path, digest):
+        return path
 
     ensure_kr_font()
-    fig, ax = plt.subplots(figsize=(8, 2.8))
+    fig = Figure(figsize=(8, 2.8))
+    ax = fig.subplots()
     ax.set_title(f"Customs/Logistics Flow | {company} - {country}", fontsize=11)
     ax.axis("off")
 
@@ -126,7 +218,7 @@ def render_customs_flow_png(company, country):
             )
 
     fig.tight_layout()
-    fig.savefig(path, dpi=150)
-    plt.close(fig)
+    save_figure(fig, path, "diagram", dpi=150)
+    mark_rendered(path, digest)
     return path
 
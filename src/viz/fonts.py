@@ -1,42 +1,102 @@
+import json
 import os
+import threading
+from pathlib import Path
+from typing import Optional, Tuple
 from matplotlib import pyplot as plt
 from matplotlib import font_manager
 from matplotlib.font_manager import FontProperties
+from loguru import logger
 
 
-def ensure_kr_font() -> str:
-    """Best-effort: register a KR-capable font and set rcParams.
+# Resolved font persisted across runs/processes: {"path": ..., "family": ...}
+FONT_CACHE_PATH = Path(__file__).resolve().parents[2] / "artifacts" / "cache" / "font_cache.json"
 
-    Returns the selected family name (or empty string if unknown).
-    """
-    # Prefer Nanum or Malgun if present
-    candidates = [
-        r"C:\\Windows\\Fonts\\NanumGothic.ttf",
-        r"C:\\Windows\\Fonts\\NanumGothicBold.ttf",
-        r"C:\\Windows\\Fonts\\malgun.ttf",
-        r"C:\\Windows\\Fonts\\malgunbd.ttf",
-        r"/System/Library/Fonts/AppleSDGothicNeo.ttc",
-        r"/usr/share/fonts/truetype/noto/NotoSansCJK-Regular.ttc",
-        r"/usr/share/fonts/truetype/noto/NotoSansCJKkr-Regular.otf",
-        r"/usr/share/fonts/truetype/nanum/NanumGothic.ttf",
-    ]
-    for path in candidates:
+# Prefer Nanum or Malgun if present
+CANDIDATES = [
+    r"C:\\Windows\\Fonts\\NanumGothic.ttf",
+    r"C:\\Windows\\Fonts\\NanumGothicBold.ttf",
+    r"C:\\Windows\\Fonts\\malgun.ttf",
+    r"C:\\Windows\\Fonts\\malgunbd.ttf",
+    r"/System/Library/Fonts/AppleSDGothicNeo.ttc",
+    r"/usr/share/fonts/truetype/noto/NotoSansCJK-Regular.ttc",
+    r"/usr/share/fonts/truetype/noto/NotoSansCJKkr-Regular.otf",
+    r"/usr/share/fonts/truetype/nanum/NanumGothic.ttf",
+]
+FALLBACK_FAMILIES = ["NanumGothic", "Malgun Gothic", "AppleGothic", "Noto Sans CJK KR", "DejaVu Sans"]
+
+_family: Optional[str] = None
+_lock = threading.Lock()
+
+
+def _scan() -> Tuple[Optional[str], str]:
+    for path in CANDIDATES:
         if os.path.exists(path):
             try:
                 font_manager.fontManager.addfont(path)
                 family = FontProperties(fname=path).get_name()
                 if family:
-                    plt.rcParams["font.family"] = family
-                    plt.rcParams["axes.unicode_minus"] = False
-                    plt.rcParams["figure.dpi"] = 100
-                    plt.rcParams["savefig.dpi"] = 100
-                    return family
+                    return path, family
             except Exception:
                 continue
+    # No KR font file: keep only fallback families matplotlib actually has, so
+    # later renders do not emit "findfont: Font family ... not found" warnings
+    installed = {f.name for f in font_manager.fontManager.ttflist}
+    family = next((f for f in FALLBACK_FAMILIES if f in installed), "DejaVu Sans")
+    return None, family
+
+
+def _load_cached() -> Optional[Tuple[Optional[str], str]]:
+    try:
+        data = json.loads(FONT_CACHE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    path, family = data.get("path"), data.get("family")
+    if not family or data.get("candidates") != CANDIDATES:
+        return None
+    if path:
+        if not os.path.exists(path):
+            return None
+        try:
+            font_manager.fontManager.addfont(path)
+        except Exception:
+            return None
+    elif any(os.path.exists(p) for p in CANDIDATES):
+        # a KR font was installed since the fallback was cached
+        return None
+    return path, family
 
-    # Fallback to common family names (may still warn if missing)
-    plt.rcParams["font.family"] = ["NanumGothic", "Malgun Gothic", "AppleGothic", "Noto Sans CJK KR", "DejaVu Sans"]
-    plt.rcParams["axes.unicode_minus"] = False
-    plt.rcParams["figure.dpi"] = 100
-    plt.rcParams["savefig.dpi"] = 100
-    return ""
+
+def _save_cached(path: Optional[str], family: str) -> None:
+    try:
+        FONT_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = FONT_CACHE_PATH.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"path": path, "family": family, "candidates": CANDIDATES}), encoding="utf-8")
+        os.replace(tmp, FONT_CACHE_PATH)
+    except OSError as e:
+        logger.warning("Could not write font cache {}: {}", FONT_CACHE_PATH, e)
+
+
+def ensure_kr_font() -> str:
+    """Best-effort: register a KR-capable font and set rcParams.
+
+    Resolution runs once per process (and is reused across processes via
+    ``artifacts/cache/font_cache.json``); later calls return immediately.
+    Returns the selected family name (or empty string if no KR font was found).
+    """
+    global _family
+    if _family is not None:
+        return _family
+    with _lock:
+        if _family is None:
+            cached = _load_cached()
+            path, family = cached if cached else _scan()
+            if not cached:
+                _save_cached(path, family)
+                logger.debug("Resolved plot font: {} ({})", family, path or "fallback family")
+            plt.rcParams["font.family"] = family
+            plt.rcParams["axes.unicode_minus"] = False
+            plt.rcParams["figure.dpi"] = 100
+            plt.rcParams["savefig.dpi"] = 100
+            _family = family if path else ""
+        return _family
@@ -0,0 +1,171 @@
+import hashlib
+import io
+import os
+import threading
+from pathlib import Path
+from typing import Optional, Union
+from PIL import Image
+import matplotlib
+from loguru import logger
+from ..utils.disk_cache import trim_cache_dir
+
+
+# Artifact types and the env var selecting their output format
+#   diagram: market summary, customs flow  -> png | png-opt | svg | pdf
+#   map:     competition map/heatmap, partner map -> png | png-opt | webp
+FORMAT_ENV = {"diagram": "DIAGRAM_FORMAT", "map": "MAP_FORMAT"}
+ALLOWED = {"diagram": ("png", "png-opt", "svg", "pdf"), "map": ("png", "png-opt", "webp")}
+EXTENSIONS = (".png", ".svg", ".pdf", ".webp")
+# Raster copies of vector artifacts for DOCX (python-docx cannot embed SVG/PDF)
+RASTER_DIR = ".raster"
+# Downscaled copies embedded in the Word report (see docx_image)
+DOCX_IMAGE_DIR = Path(__file__).resolve().parents[2] / "artifacts" / "cache" / "docx_images"
+
+# Set once at import rather than per save: rc_context is not thread-safe and nodes
+# render concurrently. Text stays text in SVG (a few KB instead of glyph outlines).
+matplotlib.rcParams["svg.fonttype"] = "none"
+matplotlib.rcParams["svg.hashsalt"] = "render"
+
+
+def artifact_format(kind: str) -> str:
+    fmt = os.getenv(FORMAT_ENV[kind], "png").lower()
+    if fmt not in ALLOWED[kind]:
+        logger.warning("{}={} not supported for {} artifacts; using png", FORMAT_ENV[kind], fmt, kind)
+        return "png"
+    return fmt
+
+
+def artifact_path(png_path: str, kind: str) -> str:
+    """``png_path`` with the extension of the configured format for ``kind``."""
+    ext = {"svg": ".svg", "pdf": ".pdf", "webp": ".webp"}.get(artifact_format(kind), ".png")
+    return os.path.splitext(png_path)[0] + ext
+
+
+def raster_fallback(path: str) -> str:
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(os.path.dirname(path), RASTER_DIR, stem + ".png")
+
+
+def _drop_siblings(path: str) -> None:
+    # Switching formats must not leave the previous variant behind in the case folder
+    stem, keep = os.path.splitext(path)
+    for ext in EXTENSIONS:
+        if ext != keep and os.path.exists(stem + ext):
+            os.remove(stem + ext)
+    fallback = raster_fallback(path)
+    if keep not in (".svg", ".pdf") and os.path.exists(fallback):
+        os.remove(fallback)
+
+
+def save_figure(fig, png_path: str, kind: str, **savefig_kwargs) -> str:
+    """Save ``fig`` in the format configured for ``kind``; returns the written path.
+
+    ``savefig_kwargs`` are the renderer's usual PNG options (dpi, bbox_inches, ...).
+    """
+    fmt = artifact_format(kind)
+    path = artifact_path(png_path, kind)
+    if fmt in ("svg", "pdf"):
+        # No timestamps, so identical inputs give identical files
+        metadata = {"Date": None} if fmt == "svg" else {"CreationDate": None}
+        fig.savefig(path, format=fmt, metadata=metadata, **savefig_kwargs)
+        fallback = raster_fallback(path)
+        os.makedirs(os.path.dirname(fallback), exist_ok=True)
+        fig.savefig(fallback, format="png", **savefig_kwargs)
+    elif fmt in ("webp", "png-opt"):
+        buf = io.BytesIO()
+        fig.savefig(buf, format="png", **savefig_kwargs)
+        buf.seek(0)
+        img = Image.open(buf)
+        if fmt == "webp":
+            img.save(path, "WEBP", quality=int(os.getenv("WEBP_QUALITY", "80")), method=6)
+        else:
+            # 256-colour palette + zlib optimisation: flat charts/maps lose nothing visible
+            img.convert("RGBA").quantize(256, method=Image.Quantize.FASTOCTREE).save(path, "PNG", optimize=True)
+    else:
+        fig.savefig(path, format="png", **savefig_kwargs)
+    _drop_siblings(path)
+    return path
+
+
+def report_image_dpi() -> int:
+    return int(os.getenv("REPORT_IMAGE_DPI", "150"))
+
+
+def _docx_image_cache_bytes() -> int:
+    return int(float(os.getenv("DOCX_IMAGE_CACHE_MB", "128")) * 1024 * 1024)
+
+
+def _resampled(path: str, width_in: float, kind: Optional[str] = None) -> str:
+    dpi = report_image_dpi()
+    width_px = max(1, round(width_in * dpi))
+    is_webp = os.path.splitext(path)[1].lower() == ".webp"
+    palette = kind == "diagram" and not is_webp
+    # Keyed by content, so identical images map to one cached file (and one media part in the DOCX)
+    with open(path, "rb") as f:
+        data = f.read()
+    ext = ".jpg" if is_webp else ".png"
+    mode = "p" if palette else "l"
+    out = DOCX_IMAGE_DIR / f"{hashlib.sha256(data).hexdigest()[:24]}_{width_px}_{dpi}{mode}{ext}"
+    if out.exists():
+        os.utime(out, None)
+        return str(out)
+    img = Image.open(io.BytesIO(data))
+    img.load()
+    if img.width > width_px:
+        img = img.resize((width_px, max(1, round(img.height * width_px / img.width))), Image.Resampling.LANCZOS)
+    DOCX_IMAGE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        if is_webp:
+            # JPEG keeps the embedded copy close to the (lossy) WebP size
+            img.convert("RGB").save(tmp, "JPEG", quality=90, dpi=(dpi, dpi))
+        elif palette:
+            # Charts only: same palette reduction as png-opt, since resampling adds
+            # antialiasing colours that would otherwise make the smaller image the larger file
+            img = img.convert("RGBA").quantize(256, method=Image.Quantize.FASTOCTREE)
+            img.save(tmp, "PNG", optimize=True, dpi=(dpi, dpi))
+        else:
+            # Maps (photographic basemaps) stay lossless
+            img.save(tmp, "PNG", optimize=True, dpi=(dpi, dpi))
+        os.replace(tmp, out)
+    finally:
+        tmp.unlink(missing_ok=True)
+    trim_cache_dir(DOCX_IMAGE_DIR, _docx_image_cache_bytes(), keep=out, patterns=("*.png", "*.jpg"))
+    return str(out)
+
+
+def docx_image(
+    path: Optional[str], width_in: Optional[float] = None, kind: Optional[str] = None
+) -> Optional[Union[str, io.BytesIO]]:
+    """Something ``python-docx`` can embed for an artifact, or None if unavailable.
+
+    With ``width_in`` the image is downscaled to ``REPORT_IMAGE_DPI`` at that print
+    width (never upscaled) and served from ``artifacts/cache/docx_images``. Only
+    ``kind="diagram"`` PNGs are palette-reduced; maps are kept lossless.
+    """
+    if not path:
+        return None
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".svg", ".pdf"):
+        path = raster_fallback(path)
+        ext = ".png"
+    if not os.path.exists(path):
+        return None
+    if width_in:
+        return _resampled(path, width_in, kind)
+    if ext == ".webp":
+        # JPEG keeps the embedded copy close to the (lossy) WebP size
+        buf = io.BytesIO()
+        Image.open(path).convert("RGB").save(buf, "JPEG", quality=90)
+        buf.seek(0)
+        return buf
+    return path
+
+
+def existing_variant(png_path: str) -> Optional[str]:
+    """The artifact written for ``png_path`` in whichever format it was saved, if any."""
+    stem = os.path.splitext(png_path)[0]
+    for ext in EXTENSIONS:
+        if os.path.exists(stem + ext):
+            return stem + ext
+    return None
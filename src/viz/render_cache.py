@@ -0,0 +1,68 @@
+import hashlib
+import json
+import os
+from functools import lru_cache
+from typing import Any, Sequence
+import matplotlib
+from loguru import logger
+from .fonts import ensure_kr_font
+
+
+# Sidecar manifests live next to the artifacts: outputs/{Company}_{Country}/.render/{png}.json
+MANIFEST_DIR = ".render"
+
+
+@lru_cache(maxsize=None)
+def _source_digest(path: str) -> str:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return ""
+
+
+def render_digest(kind: str, inputs: Any, sources: Sequence[str] = ()) -> str:
+    """Digest of everything a renderer draws from: its inputs, its source files,
+    matplotlib and the resolved plot font (a newly installed KR font re-renders)."""
+    ensure_kr_font()
+    payload = {
+        "kind": kind,
+        "inputs": inputs,
+        "sources": [_source_digest(p) for p in sources],
+        "matplotlib": matplotlib.__version__,
+        "font": list(matplotlib.rcParams["font.family"]),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+
+
+def _manifest_path(path: str) -> str:
+    return os.path.join(os.path.dirname(path), MANIFEST_DIR, os.path.basename(path) + ".json")
+
+
+def up_to_date(path: str, digest: str) -> bool:
+    """True when ``path`` exists and was last rendered from inputs with this ``digest``."""
+    if str(os.getenv("RENDER_FORCE", "0")).lower() in ("1", "true", "yes"):
+        return False
+    if not os.path.exists(path):
+        return False
+    try:
+        with open(_manifest_path(path), "r", encoding="utf-8") as f:
+            fresh = json.load(f).get("digest") == digest
+    except (OSError, ValueError):
+        return False
+    if fresh:
+        logger.debug("Render skipped, inputs unchanged: {}", path)
+    return fresh
+
+
+def mark_rendered(path: str, digest: str) -> None:
+    # One sidecar per artifact, replaced atomically: safe with concurrent nodes and processes
+    manifest = _manifest_path(path)
+    try:
+        os.makedirs(os.path.dirname(manifest), exist_ok=True)
+        tmp = f"{manifest}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"digest": digest, "file": os.path.basename(path)}, f)
+        os.replace(tmp, manifest)
+    except OSError as e:
+        logger.warning("Could not write render manifest for {}: {}", path, e)
@@ -0,0 +1,136 @@
+import os
+import threading
+import warnings
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+from multiprocessing import parent_process
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from loguru import logger
+from . import charts, maps
+
+
+# kind -> (renderer, planned result). The planned result is what the renderer will
+# return (output paths are fixed per case), so callers can continue before it runs.
+_JOBS: Dict[str, Tuple[Callable[..., Any], Callable[..., Any]]] = {
+    "market_summary": (charts.render_market_summary_png, charts.market_summary_path),
+    "customs_flow": (charts.render_customs_flow_png, charts.customs_flow_path),
+    "competition_heatmap": (maps.render_competition_heatmap, maps.competition_outputs),
+    "partner_map": (maps.render_partner_map, maps.partner_map_path),
+}
+
+
+def _init_render_worker():
+    # Headless backend and KR font once per worker, not once per render
+    import matplotlib  # type: ignore
+    matplotlib.use('Agg')
+    from .fonts import ensure_kr_font
+    ensure_kr_font()
+    warnings.filterwarnings("ignore", message=r"Glyph .* missing from font\(s\).*", category=UserWarning)
+
+
+def _run_job(kind: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Any:
+    return _JOBS[kind][0](*args, **kwargs)
+
+
+class RenderService:
+    """Pool of long-lived processes running the chart/map renderers.
+
+    ``submit`` queues a job and returns its future; ``wait`` blocks until every
+    job submitted so far has finished and re-raises the first failure.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker)
+        self._pending: List[Tuple[str, Future]] = []
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, *args, **kwargs) -> Future:
+        fut = self._pool.submit(_run_job, kind, args, kwargs)
+        with self._lock:
+            self._pending.append((kind, fut))
+        return fut
+
+    def wait(self) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+        wait([f for _, f in pending])
+        errors = [(kind, f.exception()) for kind, f in pending if f.exception() is not None]
+        for kind, err in errors:
+            logger.error("Render job {} failed: {}", kind, err)
+        if errors:
+            raise RuntimeError(f"{len(errors)} of {len(pending)} render jobs failed") from errors[0][1]
+        logger.info("Render service finished {} jobs", len(pending))
+        return len(pending)
+
+    def shutdown(self) -> None:
+        try:
+            self.wait()
+        finally:
+            self._pool.shutdown()
+
+
+_service: Optional[RenderService] = None
+_service_lock = threading.Lock()
+_tracking = threading.local()
+
+
+def get_render_service() -> Optional[RenderService]:
+    """The main process's service when RENDER_WORKERS > 0, else None (render inline).
+
+    Case and node worker processes always render inline rather than nesting pools.
+    """
+    global _service
+    if parent_process() is not None:
+        return None
+    workers = int(os.getenv("RENDER_WORKERS", "0") or 0)
+    if workers <= 0:
+        return None
+    with _service_lock:
+        if _service is None:
+            logger.info("Starting render service with {} worker processes", workers)
+            _service = RenderService(workers)
+        return _service
+
+
+def render(kind: str, *args, **kwargs) -> Any:
+    """Run renderer ``kind`` inline, or queue it on the render service and return its planned result."""
+    renderer, planned = _JOBS[kind]
+    service = get_render_service()
+    if service is None:
+        return renderer(*args, **kwargs)
+    fut = service.submit(kind, *args, **kwargs)
+    tracked = getattr(_tracking, "futures", None)
+    if tracked is not None:
+        tracked.append(fut)
+    return planned(*args, **kwargs)
+
+
+@contextmanager
+def track_renders() -> Iterator[List[Future]]:
+    """Collect the futures of renders queued by the current thread inside the block.
+
+    The scheduler wraps each graph node with this, so a node's cache entry and
+    checkpoint record are written only once its PNGs are actually on disk.
+    """
+    previous = getattr(_tracking, "futures", None)
+    _tracking.futures = futures = []
+    try:
+        yield futures
+    finally:
+        _tracking.futures = previous
+
+
+def wait_renders() -> int:
+    """Block until queued renders are on disk (call before anything reads the PNGs)."""
+    return _service.wait() if _service is not None else 0
+
+
+def shutdown_render_service() -> None:
+    global _service
+    with _service_lock:
+        service, _service = _service, None
+    if service is not None:
+        service.shutdown()